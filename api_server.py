@@ -1,16 +1,33 @@
-import logging
-from flask import Flask, request, jsonify, send_from_directory
+import atexit
 import json
+import logging
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, redirect, stream_with_context
 from pathlib import Path
-import requests
 import os
-import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
 
 # Imports des modules app/
 from app.scheduler import start_scheduler, stop_scheduler
-from app.chess_updater import update_all_players
+from app.chess_updater import update_all_players, get_staleness, build_new_player
 from app.chess_api import fetch_player_stats
-from app.config import JSON_PATH, SLACK_BOT_TOKEN, PLAYERS_JSON_LOCK
+from app import http_client
+from app.config import (
+    SLACK_BOT_TOKEN, SSE_ENABLED, SSE_PORT, SSE_PUBLIC_URL, MULTIPROCESS_ENABLED, LEADER_LEASE_PATH,
+    LEADER_RETRY_SECONDS, SLACK_API_TIMEOUT
+)
+from app.multiprocess import LeaderLease
+from app.player_store import PLAYER_STORE
+from app.leaderboard import get_leaderboard, get_changes
+from app.roster_payload import get_roster_payload
+from app.sse import SSE_HUB, STREAM_PATH, start_sse_server
+from app.timeseries import TIMESERIES
+from app.importer import FORMATS as IMPORT_FORMATS, iter_rows, import_players
+from app.profiling import PROFILING_ENABLED, install_route_profiling, list_profiles, latest_profile
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, DATA_RESPONSE_BYTES, render_metrics
+from app.slack_jobs import SLACK_JOBS, ROSTER_BATCHER, DUPLICATE, FULL
+from app.slack_directory import SLACK_DIRECTORY, SlackAPIError, start_directory_warmup
 
 # Configuration logging
 logging.basicConfig(
@@ -34,7 +51,103 @@ def serve_static(path):
 # Servir les données JSON pour le frontend
 @app.route('/data/<path:path>')
 def serve_data(path):
-    return send_from_directory('data', path)
+    if path == 'players.json':
+        response = serve_roster()
+    else:
+        response = send_from_directory('data', path)
+    if response.status_code < 400:
+        DATA_RESPONSE_BYTES.observe(
+            response.content_length or 0,
+            file=path, encoding=response.headers.get('Content-Encoding', 'identity')
+        )
+    return response
+
+def serve_roster():
+    """
+    Sert le roster depuis le store (à jour même quand le snapshot disque attend sa compaction),
+    avec des octets pré-compressés par version et un ETag fort par encodage : 304 si le client est à jour.
+    """
+    payload = get_roster_payload()
+    body, encoding = payload.body_for(request.accept_encodings)
+    etag = payload.etag_for(encoding)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'  # Toujours revalider (304 si inchangé)
+    return response
+
+# Classement paginé, trié et classé côté serveur
+@app.route('/api/leaderboard', methods=['GET'])
+def leaderboard():
+    try:
+        page = get_leaderboard(
+            mode=request.args.get('mode', 'rapid'),
+            promo=request.args.get('promo'),
+            classe=request.args.get('class'),
+            limit=request.args.get('limit', 50),
+            offset=request.args.get('offset', 0)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page), 200
+
+# Deltas depuis une version connue du client (snapshot complet si trop ancienne)
+@app.route('/api/leaderboard/changes', methods=['GET'])
+def leaderboard_changes():
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({"error": "Query parameter 'since' (int) is required."}), 400
+    return jsonify(get_changes(since)), 200
+
+# Flux SSE des nouvelles versions du roster : les connexions sont tenues par le serveur
+# asyncio dédié (app/sse.py), cette route ne fait que rediriger pour ne pas bloquer un worker Flask
+@app.route('/api/leaderboard/stream', methods=['GET'])
+def leaderboard_stream():
+    # En multi-processus, le serveur SSE tourne dans le processus leader (même hôte)
+    if not SSE_HUB.running and not (MULTIPROCESS_ENABLED and SSE_ENABLED):
+        return jsonify({"error": "SSE disabled"}), 404
+    if SSE_PUBLIC_URL:
+        return redirect(SSE_PUBLIC_URL, code=307)
+    # Le serveur SSE parle HTTP en clair sur SSE_PORT : derrière un reverse proxy ou en HTTPS,
+    # l'URL publique du flux ne se devine pas (schéma, hôte et port vus du client)
+    if request.scheme == 'https' or 'X-Forwarded-Proto' in request.headers or 'X-Forwarded-Host' in request.headers:
+        logger.warning("SSE stream requested through a proxy or HTTPS but SSE_PUBLIC_URL is not set")
+        return jsonify({"error": "SSE_PUBLIC_URL is not configured"}), 503
+    hostname = urlsplit(f"//{request.host}").hostname
+    if ':' in hostname:
+        hostname = f"[{hostname}]"  # IPv6
+    return redirect(f"http://{hostname}:{SSE_PORT}{STREAM_PATH}", code=307)
+
+# Métriques au format Prometheus (updater, appels Chess.com, locks, Slack, /data)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+# Profils cProfile / tracemalloc (PROFILING_MODE) : liste et dernier profil
+@app.route('/api/admin/profiles', methods=['GET'])
+def profiles_index():
+    if not PROFILING_ENABLED:
+        return jsonify({"error": "Profiling disabled"}), 404
+    return jsonify({"profiles": list_profiles()}), 200
+
+@app.route('/api/admin/profiles/latest', methods=['GET'])
+def profiles_latest():
+    if not PROFILING_ENABLED:
+        return jsonify({"error": "Profiling disabled"}), 404
+    kind = request.args.get('format', 'txt')
+    if kind not in ('txt', 'prof'):
+        return jsonify({"error": "Invalid format. Use 'txt' or 'prof'"}), 400
+    path = latest_profile(request.args.get('name'), kind)
+    if path is None:
+        return jsonify({"error": "No profile available yet"}), 404
+    if kind == 'prof':
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=path.name)
+    return send_file(path, mimetype='text/plain')
 
 # API pour update complet (POST liste de joueurs)
 @app.route('/api/players', methods=['POST'])
@@ -43,29 +156,90 @@ def update_players():
         data = request.get_json()
         if not isinstance(data, list):
             return jsonify({"error": "Payload must be a list of players."}), 400
-        with open(JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        PLAYER_STORE.replace_all(data)
         return jsonify({"message": "players.json updated", "count": len(data)}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Import en masse (CSV ou NDJSON) : progression streamée en NDJSON, un seul commit du roster
+@app.route('/api/players/import', methods=['POST'])
+def import_players_route():
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'ndjson' if 'json' in (request.mimetype or '') else 'csv'
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": f"Invalid format: {fmt}. Use one of {', '.join(IMPORT_FORMATS)}"}), 400
+
+    def generate():
+        for event in import_players(iter_rows(request.stream, fmt)):
+            yield json.dumps(event) + '\n'
+
+    logger.info(f"Bulk import started ({fmt})")
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 # API pour déclencher manuellement la mise à jour
 @app.route('/api/refresh', methods=['POST'])
 def manual_refresh():
     """Déclenche manuellement la mise à jour de tous les joueurs (utile pour tests)."""
     logger.info("Manual refresh triggered via /api/refresh")
-    result = update_all_players()
+    # Sans attendre : un cycle en cours (scheduler ou autre worker) répond 409
+    result = update_all_players(wait=False)
 
     if result.get('success'):
         return jsonify(result), 200
+    elif result.get('busy'):
+        return jsonify(result), 409
     else:
         return jsonify(result), 500
 
+# Historique long terme d'un joueur (séries du TimeSeriesStore, hors players.json)
+@app.route('/api/players/<username>/history', methods=['GET'])
+def player_history(username):
+    now = time.time()
+    try:
+        end = _parse_timestamp(request.args.get('to'), now)
+        start = _parse_timestamp(request.args.get('from'), end - 30 * 86400)
+        resolution = request.args.get('resolution', 'day')
+        if not PLAYER_STORE.exists(username) and not TIMESERIES.exists(username):
+            return jsonify({"error": f"Unknown player: {username}"}), 404
+        points = TIMESERIES.query(username, start, end, resolution)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "username": username,
+        "resolution": resolution,
+        "from": int(start),
+        "to": int(end),
+        "fields": ["t", "rapid", "blitz"],
+        "points": [list(p) for p in points]
+    }), 200
+
+def _parse_timestamp(value, default):
+    """Accepte un timestamp epoch ou une date ISO (YYYY-MM-DD[THH:MM], UTC si pas de fuseau)."""
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}. Use epoch seconds or ISO 8601.")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+# Fraîcheur des données par joueur (secondes depuis le dernier rafraîchissement réussi)
+@app.route('/api/players/staleness', methods=['GET'])
+def players_staleness():
+    return jsonify(get_staleness()), 200
+
 # Helper pour envoyer une réponse différée à Slack
 def send_delayed_response(response_url, message):
     """Envoie un message via response_url de Slack."""
     try:
-        requests.post(response_url, json={"text": message, "response_type": "ephemeral"})
+        http_client.post(response_url, json={"text": message, "response_type": "ephemeral"}, timeout=SLACK_API_TIMEOUT)
     except Exception as e:
         logger.error(f"Failed to send delayed response: {e}")
 
@@ -87,23 +261,9 @@ def add_chess_account_worker(text, user_id, response_url):
             send_delayed_response(response_url, "❌ Erreur: SLACK_BOT_TOKEN non configuré.")
             return
 
+        # Annuaire en cache (préchargé via users.list), users.info seulement sur un miss
         try:
-            resp = requests.get(
-                'https://slack.com/api/users.info',
-                params={'user': user_id},
-                headers={'Authorization': f'Bearer {slack_token}'}
-            )
-            if resp.status_code == 200 and resp.json().get('ok'):
-                profile = resp.json()['user']['profile']
-                first_name = profile.get('first_name', '')
-                last_name = profile.get('last_name', '')
-
-                if not first_name and not last_name:
-                    real_name = profile.get('real_name', '')
-                    if real_name:
-                        parts_name = real_name.split(' ', 1)
-                        first_name = parts_name[0] if len(parts_name) > 0 else ''
-                        last_name = parts_name[1] if len(parts_name) > 1 else ''
+            first_name, last_name = SLACK_DIRECTORY.lookup(user_id)
         except Exception as e:
             logger.error(f"Exception fetching Slack user info: {e}")
 
@@ -111,61 +271,34 @@ def add_chess_account_worker(text, user_id, response_url):
         send_delayed_response(response_url, "❌ Aucun pseudo fourni.")
         return
 
+    # Pré-vérification O(1) sans lock : évite des appels Chess.com inutiles (revérifié sous lock)
+    if PLAYER_STORE.exists(pseudo):
+        send_delayed_response(response_url, f"❌ Le pseudo {pseudo} existe déjà.")
+        return
+
     # Récupérer les stats Chess.com AVANT de prendre le lock (pour éviter de bloquer trop longtemps)
     new_stats = fetch_player_stats(pseudo)
     if not new_stats:
         send_delayed_response(response_url, f"❌ Impossible de récupérer les stats Chess.com pour {pseudo}.")
         return
 
-    rapid_current = new_stats['rapid']['current']
-    history7days = [rapid_current] * 7
-
-    from datetime import datetime
-    today = datetime.now().date().isoformat()
-
-    joueur = {
-        "username": pseudo,
-        "firstName": first_name,
-        "lastName": last_name,
-        "promo": promo,
-        "class": classe,
-        "previousRank": 0,
-        "rapid": new_stats['rapid'],
-        "blitz": new_stats['blitz'],
-        "history7days": history7days,
-        "lastHistoryUpdate": today,
-        "stats": new_stats['stats'],
-        "avatar": new_stats['avatar']
-    }
-
-    # SECTION CRITIQUE: Protégée par lock
-    with PLAYERS_JSON_LOCK:
-        try:
-            with open(JSON_PATH, 'r', encoding='utf-8') as f:
-                players = json.load(f)
-        except Exception:
-            players = []
-
-        # Vérifier si déjà présent (username)
-        if any(isinstance(p, dict) and p.get('username') == pseudo for p in players):
-            send_delayed_response(response_url, f"❌ Le pseudo {pseudo} existe déjà.")
-            return
-
-        # Vérifier si firstName + lastName existe déjà
-        if first_name and last_name:
-            if any(isinstance(p, dict) and
-                   p.get('firstName', '').lower() == first_name.lower() and
-                   p.get('lastName', '').lower() == last_name.lower()
-                   for p in players):
-                send_delayed_response(response_url, f"❌ Un compte existe déjà pour {first_name} {last_name}. Vous ne pouvez avoir qu'un seul pseudo.")
-                return
+    joueur = build_new_player(pseudo, first_name, last_name, promo, classe, new_stats)
 
-        # Ajouter le joueur
-        players.append(joueur)
+    # Vérification des doublons (username, prénom + nom) + ajout, sous lock, dans un commit
+    # regroupé avec les autres commandes Slack reçues dans la même fenêtre
+    try:
+        outcome = ROSTER_BATCHER.add(joueur)
+    except Exception as e:
+        logger.error(f"Failed to add {pseudo} to players.json: {e}")
+        send_delayed_response(response_url, "❌ Erreur de sauvegarde.")
+        return
 
-        # Sauvegarder
-        with open(JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(players, f, indent=2, ensure_ascii=False)
+    if outcome == 'exists':
+        send_delayed_response(response_url, f"❌ Le pseudo {pseudo} existe déjà.")
+        return
+    if outcome == 'name_exists':
+        send_delayed_response(response_url, f"❌ Un compte existe déjà pour {first_name} {last_name}. Vous ne pouvez avoir qu'un seul pseudo.")
+        return
 
     logger.info(f"Added account for {first_name} {last_name} - username: {pseudo}, rapid: {joueur['rapid']['current']}, blitz: {joueur['blitz']['current']}")
 
@@ -179,10 +312,13 @@ def add_chess_account():
     user_id = request.form.get('user_id', '').strip()
     response_url = request.form.get('response_url', '')
 
-    # Lancer le traitement en arrière-plan
-    thread = threading.Thread(target=add_chess_account_worker, args=(text, user_id, response_url))
-    thread.daemon = True
-    thread.start()
+    # Traitement en arrière-plan par le pool de workers (une seule demande en attente par utilisateur)
+    key = ('chessadd', user_id or text.split(' ', 1)[0].lower())
+    status = SLACK_JOBS.submit(key, add_chess_account_worker, text, user_id, response_url)
+    if status == DUPLICATE:
+        return "⏳ Ta demande précédente est encore en cours de traitement.", 200
+    if status == FULL:
+        return "❌ Trop de demandes en cours, réessaie dans quelques instants.", 200
 
     # Réponse immédiate pour éviter le timeout Slack
     return "⏳ Ajout en cours... Tu recevras une confirmation dans quelques secondes.", 200
@@ -198,26 +334,12 @@ def delete_chess_account_worker(user_id, response_url):
         send_delayed_response(response_url, "❌ Erreur: SLACK_BOT_TOKEN non configuré.")
         return
 
+    # Annuaire en cache (préchargé via users.list), users.info seulement sur un miss
     try:
-        resp = requests.get(
-            'https://slack.com/api/users.info',
-            params={'user': user_id},
-            headers={'Authorization': f'Bearer {slack_token}'}
-        )
-        if resp.status_code == 200 and resp.json().get('ok'):
-            profile = resp.json()['user']['profile']
-            first_name = profile.get('first_name', '')
-            last_name = profile.get('last_name', '')
-
-            if not first_name and not last_name:
-                real_name = profile.get('real_name', '')
-                if real_name:
-                    parts = real_name.split(' ', 1)
-                    first_name = parts[0] if len(parts) > 0 else ''
-                    last_name = parts[1] if len(parts) > 1 else ''
-        else:
-            send_delayed_response(response_url, f"❌ Erreur API Slack: {resp.json().get('error', 'unknown')}")
-            return
+        first_name, last_name = SLACK_DIRECTORY.lookup(user_id)
+    except SlackAPIError as e:
+        send_delayed_response(response_url, f"❌ Erreur API Slack: {e.error}")
+        return
     except Exception as e:
         logger.error(f"Exception fetching Slack user info: {e}")
         send_delayed_response(response_url, f"❌ Erreur lors de la récupération des infos Slack.")
@@ -227,41 +349,20 @@ def delete_chess_account_worker(user_id, response_url):
         send_delayed_response(response_url, "❌ Impossible de récupérer votre prénom/nom depuis Slack.")
         return
 
-    # SECTION CRITIQUE: Protégée par lock
-    with PLAYERS_JSON_LOCK:
-        try:
-            with open(JSON_PATH, 'r', encoding='utf-8') as f:
-                players = json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load players.json: {e}")
-            send_delayed_response(response_url, "❌ Erreur de chargement des données.")
-            return
-
-        # Chercher et supprimer le joueur
-        initial_count = len(players)
-        players = [
-            p for p in players
-            if not (isinstance(p, dict) and
-                    p.get('firstName', '').lower() == first_name.lower() and
-                    p.get('lastName', '').lower() == last_name.lower())
-        ]
-
-        if len(players) == initial_count:
-            send_delayed_response(response_url, f"❌ Aucun compte trouvé pour {first_name} {last_name}.")
-            return
-
-        # Sauvegarder
-        try:
-            with open(JSON_PATH, 'w', encoding='utf-8') as f:
-                json.dump(players, f, indent=2, ensure_ascii=False)
+    # Suppression sous lock, dans un commit regroupé avec les autres commandes Slack
+    try:
+        removed = ROSTER_BATCHER.remove_by_name(first_name, last_name)
+    except Exception as e:
+        logger.error(f"Failed to delete account for {first_name} {last_name}: {e}")
+        send_delayed_response(response_url, "❌ Erreur de sauvegarde.")
+        return
 
-            removed_count = initial_count - len(players)
-            logger.info(f"Deleted account for {first_name} {last_name} ({removed_count} removed)")
+    if not removed:
+        send_delayed_response(response_url, f"❌ Aucun compte trouvé pour {first_name} {last_name}.")
+        return
 
-            send_delayed_response(response_url, "✅ Ton compte a été supprimé du classement Chess.com!")
-        except Exception as e:
-            logger.error(f"Failed to save players.json: {e}")
-            send_delayed_response(response_url, "❌ Erreur de sauvegarde.")
+    logger.info(f"Deleted account for {first_name} {last_name} ({len(removed)} removed)")
+    send_delayed_response(response_url, "✅ Ton compte a été supprimé du classement Chess.com!")
 
 # Route Slack pour supprimer un compte
 @app.route('/slack/chessdelete', methods=['POST'])
@@ -273,17 +374,49 @@ def delete_chess_account():
     if not user_id:
         return "❌ Erreur: user_id manquant.", 200
 
-    # Lancer le traitement en arrière-plan
-    thread = threading.Thread(target=delete_chess_account_worker, args=(user_id, response_url))
-    thread.daemon = True
-    thread.start()
+    # Traitement en arrière-plan par le pool de workers (une seule demande en attente par utilisateur)
+    status = SLACK_JOBS.submit(('chessdelete', user_id), delete_chess_account_worker, user_id, response_url)
+    if status == DUPLICATE:
+        return "⏳ Ta demande précédente est encore en cours de traitement.", 200
+    if status == FULL:
+        return "❌ Trop de demandes en cours, réessaie dans quelques instants.", 200
 
     # Réponse immédiate pour éviter le timeout Slack
     return "⏳ Suppression en cours... Tu recevras une confirmation dans quelques secondes.", 200
 
+# Profilage des routes listées dans PROFILING_ROUTES (toutes les routes sont déclarées)
+install_route_profiling(app)
+
+def _start_leader_services():
+    start_scheduler()
+    start_sse_server()
+    atexit.register(stop_scheduler)
+
+def start_background_services():
+    """
+    Démarre le scheduler et le serveur SSE (point d'entrée WSGI, voir wsgi.py).
+    En multi-processus, seul le processus qui détient le bail de leader les
+    démarre ; les autres prennent le relais si le leader s'arrête. Le
+    préchargement de l'annuaire Slack tourne dans chaque worker.
+    """
+    start_directory_warmup()
+    if MULTIPROCESS_ENABLED:
+        lease = LeaderLease(LEADER_LEASE_PATH, LEADER_RETRY_SECONDS)
+        # Enregistré avant l'élection : à l'arrêt (atexit en ordre inverse), le scheduler
+        # s'arrête d'abord, puis le bail est libéré
+        atexit.register(lease.stop)
+        lease.run(_start_leader_services)
+    else:
+        _start_leader_services()
+
 if __name__ == "__main__":
     # Démarrer le scheduler pour mise à jour automatique
     start_scheduler()
+    # Démarrer le serveur SSE (push des nouvelles versions du classement)
+    # Avec le reloader de debug, seul le processus enfant (WERKZEUG_RUN_MAIN) sert les requêtes
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_sse_server()
+        start_directory_warmup()
 
     try:
         app.run(host="0.0.0.0", port=5000, debug=True)
@@ -1,10 +1,111 @@
 # Wrapper réutilisable pour l'API Chess.com
-import requests
+import json
 import logging
-from .config import CHESS_API_BASE_URL, CHESS_API_TIMEOUT, CHESS_API_HEADERS
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import requests
+from . import http_client
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .config import (
+    CHESS_API_BASE_URL, CHESS_API_TIMEOUT, CHESS_API_HEADERS, CHESS_API_RATE_LIMIT, CHESS_API_BURST,
+    PROFILE_CACHE_TTL_HOURS, CHESS_API_MAX_RETRIES, CHESS_API_BACKOFF_BASE_SECONDS,
+    CHESS_API_BACKOFF_MAX_SECONDS, CHESS_API_BREAKER_THRESHOLD, CHESS_API_BREAKER_RESET_SECONDS
+)
+from .http_cache import RESPONSE_CACHE
+from .metrics import CHESS_API_LATENCY, Gauge
+from .rate_limiter import TokenBucket
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Limiteur global : partagé par l'updater et les workers Slack
+CHESS_API_RATE_LIMITER = TokenBucket(CHESS_API_RATE_LIMIT, CHESS_API_BURST)
+
+# Disjoncteur global : ouvert après une série de 5xx / timeouts, le reste du cycle est différé
+CHESS_API_BREAKER = CircuitBreaker('chess.com', CHESS_API_BREAKER_THRESHOLD, CHESS_API_BREAKER_RESET_SECONDS)
+Gauge('chessapi_chess_circuit_open', 'Chess.com circuit breaker open (1) or not (0)',
+      func=lambda: int(CHESS_API_BREAKER.stats()['state'] == 'open'))
+Gauge('chessapi_chess_circuit_failures', 'Consecutive Chess.com failures seen by the circuit breaker',
+      func=lambda: CHESS_API_BREAKER.stats()['failures'])
+Gauge('chessapi_chess_circuit_rejected', 'Chess.com calls refused by the open circuit since startup',
+      func=lambda: CHESS_API_BREAKER.stats()['rejected'])
+
+# Avatars par username, rafraîchis au plus une fois par PROFILE_CACHE_TTL_HOURS
+PROFILE_CACHE = TTLCache(PROFILE_CACHE_TTL_HOURS * 3600)
+
+# Valeur renvoyée par fetch_player_stats(report_deferred=True) quand le disjoncteur a refusé l'appel
+DEFERRED = object()
+
+def _retry_delay(resp, attempt):
+    """
+    Délai avant de rejouer une requête 429 : `Retry-After` (secondes ou date HTTP)
+    s'il est fourni, sinon backoff exponentiel avec jitter complet. Borné par
+    CHESS_API_BACKOFF_MAX_SECONDS.
+    """
+    retry_after = resp.headers.get('Retry-After')
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return max(0.0, min(delay, CHESS_API_BACKOFF_MAX_SECONDS))
+    ceiling = min(CHESS_API_BACKOFF_MAX_SECONDS, CHESS_API_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+def _cached_get(url):
+    """
+    GET conditionnel : envoie les validateurs du cache disque s'ils existent.
+
+    Sur un 429, le limiteur global est mis en pause (Retry-After ou backoff
+    exponentiel) puis la requête est rejouée, jusqu'à CHESS_API_MAX_RETRIES fois.
+    Les 5xx et erreurs réseau comptent comme des échecs du disjoncteur ; quand il
+    est ouvert, CircuitOpenError est levée sans appel réseau.
+
+    Returns:
+        tuple (response, entry) où entry est l'entrée de cache utilisée (ou None)
+    """
+    entry = RESPONSE_CACHE.get(url)
+    endpoint = 'stats' if url.endswith('/stats') else 'profile'
+    headers = dict(CHESS_API_HEADERS)
+    headers.update(RESPONSE_CACHE.conditional_headers(entry))
+
+    for attempt in range(CHESS_API_MAX_RETRIES + 1):
+        CHESS_API_BREAKER.check()
+        CHESS_API_RATE_LIMITER.acquire()
+        started = time.perf_counter()
+        try:
+            resp = http_client.get(url, timeout=CHESS_API_TIMEOUT, headers=headers)
+        except requests.RequestException:
+            CHESS_API_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, status='error')
+            CHESS_API_BREAKER.record_failure()
+            raise
+        CHESS_API_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, status=resp.status_code)
+
+        if resp.status_code == 429:
+            # Ni succès ni échec : libère l'appel test éventuel (sinon la relance serait refusée)
+            CHESS_API_BREAKER.release_probe()
+        if resp.status_code == 429 and attempt < CHESS_API_MAX_RETRIES:
+            delay = _retry_delay(resp, attempt)
+            logger.warning(f"Chess.com throttled {url}: backing off {delay:.1f}s (retry {attempt + 1}/{CHESS_API_MAX_RETRIES})")
+            # Pause globale : les autres threads du pool attendent aussi
+            CHESS_API_RATE_LIMITER.pause(delay)
+            continue
+        break
+
+    if resp.status_code >= 500:
+        CHESS_API_BREAKER.record_failure()
+    elif resp.status_code != 429:
+        CHESS_API_BREAKER.record_success()
+    if resp.status_code == 200:
+        RESPONSE_CACHE.store(url, resp)
+    return resp, entry
+
 def fetch_player_profile(username):
     """
     Récupère le profil Chess.com (avatar).
@@ -17,69 +118,108 @@ def fetch_player_profile(username):
     """
     try:
         url = f'{CHESS_API_BASE_URL}/{username}'
-        resp = requests.get(url, timeout=CHESS_API_TIMEOUT, headers=CHESS_API_HEADERS)
+        resp, entry = _cached_get(url)
         if resp.status_code == 200:
             return resp.json()
+        if resp.status_code == 304 and entry:
+            return json.loads(entry['body'])
         logger.warning(f"Profile API failed for {username}: {resp.status_code}")
         return None
+    except CircuitOpenError:
+        return None
     except Exception as e:
         logger.error(f"Exception fetching profile for {username}: {e}")
         return None
 
-def fetch_player_stats(username):
+def _load_avatar(username):
+    profile = fetch_player_profile(username)
+    if profile is None:
+        return None
+    return profile.get('avatar', '')
+
+def get_player_avatar(username):
+    """
+    Retourne l'avatar du joueur depuis le cache TTL, ou via l'API profil sur un miss.
+
+    Args:
+        username: Username Chess.com
+
+    Returns:
+        URL de l'avatar ('' si aucun) ou None en cas d'erreur
+    """
+    return PROFILE_CACHE.get_or_load(username, _load_avatar)
+
+def fetch_player_stats(username, report_deferred=False, with_avatar=True):
     """
     Récupère les stats Chess.com pour un joueur (Rapid ET Blitz).
 
     Args:
         username: Username Chess.com
+        report_deferred: Si True, retourne DEFERRED (au lieu de None) si le
+            disjoncteur refuse l'appel
+        with_avatar: Si True, renseigne `avatar` via get_player_avatar (cache TTL)
 
     Returns:
-        dict avec {rapid{current, best}, blitz{current, best}, stats{wins/losses/draws}, avatar}
-        ou None en cas d'erreur
+        dict avec {rapid{current, best}, blitz{current, best}, stats{wins/losses/draws}, avatar,
+        lastPlayed (timestamp de la dernière partie rapid/blitz, 0 si inconnu)},
+        DEFERRED, ou None en cas d'erreur. Sur un 304, les stats sont celles du
+        corps en cache : c'est à l'appelant de comparer avec son propre
+        enregistrement (le cache disque peut être plus récent que le roster)
     """
     result = {
         "rapid": {"current": 0, "best": 0},
         "blitz": {"current": 0, "best": 0},
         "stats": {"wins": 0, "losses": 0, "draws": 0},
-        "avatar": ""
+        "avatar": "",
+        "lastPlayed": 0
     }
 
-    # 1. Récupérer avatar
-    profile = fetch_player_profile(username)
-    if profile:
-        result["avatar"] = profile.get('avatar', '')
-
-    # 2. Récupérer stats
+    # 1. Récupérer stats
     try:
         url = f'{CHESS_API_BASE_URL}/{username}/stats'
-        resp = requests.get(url, timeout=CHESS_API_TIMEOUT, headers=CHESS_API_HEADERS)
-        if resp.status_code == 200:
+        resp, entry = _cached_get(url)
+        if resp.status_code == 304 and entry:
+            stats = json.loads(entry['body'])
+        elif resp.status_code == 200:
             stats = resp.json()
+        else:
+            logger.warning(f"Stats API failed for {username}: {resp.status_code}")
+            return None
 
-            # Rapid
-            rapid_data = stats.get('chess_rapid', {})
-            result["rapid"]["current"] = rapid_data.get('last', {}).get('rating', 0)
-            result["rapid"]["best"] = rapid_data.get('best', {}).get('rating', 0)
+        # Rapid
+        rapid_data = stats.get('chess_rapid', {})
+        result["rapid"]["current"] = rapid_data.get('last', {}).get('rating', 0)
+        result["rapid"]["best"] = rapid_data.get('best', {}).get('rating', 0)
 
-            # Blitz
-            blitz_data = stats.get('chess_blitz', {})
-            result["blitz"]["current"] = blitz_data.get('last', {}).get('rating', 0)
-            result["blitz"]["best"] = blitz_data.get('best', {}).get('rating', 0)
+        # Blitz
+        blitz_data = stats.get('chess_blitz', {})
+        result["blitz"]["current"] = blitz_data.get('last', {}).get('rating', 0)
+        result["blitz"]["best"] = blitz_data.get('best', {}).get('rating', 0)
 
-            # Stats W/L/D (priorité Rapid > Blitz)
-            record = rapid_data.get('record') or blitz_data.get('record') or {}
+        # Date de la dernière partie (sert au scheduler adaptatif)
+        result["lastPlayed"] = max(
+            rapid_data.get('last', {}).get('date', 0),
+            blitz_data.get('last', {}).get('date', 0)
+        )
 
-            result["stats"] = {
-                "wins": record.get('win', 0),
-                "losses": record.get('loss', 0),
-                "draws": record.get('draw', 0)
-            }
+        # Stats W/L/D (priorité Rapid > Blitz)
+        record = rapid_data.get('record') or blitz_data.get('record') or {}
 
-            return result
-        else:
-            logger.warning(f"Stats API failed for {username}: {resp.status_code}")
-            return None
+        result["stats"] = {
+            "wins": record.get('win', 0),
+            "losses": record.get('loss', 0),
+            "draws": record.get('draw', 0)
+        }
 
+    except CircuitOpenError:
+        logger.debug(f"Stats fetch deferred for {username}: circuit open")
+        return DEFERRED if report_deferred else None
     except Exception as e:
         logger.error(f"Exception fetching stats for {username}: {e}")
         return None
+
+    # 2. Récupérer avatar (cache TTL, l'API profil n'est appelée que sur un miss)
+    if with_avatar:
+        result["avatar"] = get_player_avatar(username) or ''
+
+    return result
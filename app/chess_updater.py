@@ -1,15 +1,52 @@
 # Logique métier de mise à jour des joueurs
-import json
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from pathlib import Path
-import shutil
-from .chess_api import fetch_player_stats
-from .config import JSON_PATH, RATE_LIMIT_DELAY_SECONDS, WORKING_DAYS, START_HOUR, PLAYERS_JSON_LOCK
+from .chess_api import (
+    fetch_player_stats, get_player_avatar, DEFERRED, PROFILE_CACHE, CHESS_API_BREAKER
+)
+from .http_client import get_http_stats
+from .locks import timed_lock
+from .metrics import UPDATE_PHASE_SECONDS, UPDATE_CYCLES
+from .multiprocess import InterProcessLock, SharedState
+from .player_model import rating_key
+from .player_store import PLAYER_STORE
+from .profiling import profiled
+from .timeseries import TIMESERIES
+from .config import UPDATE_MAX_WORKERS, WORKING_DAYS, START_HOUR, MULTIPROCESS_ENABLED, UPDATE_LOCK_PATH, UPDATE_STATE_PATH
 
 logger = logging.getLogger(__name__)
 
+# Un seul cycle de fetch à la fois (complet ou partiel, planifié ou manuel) ; entre processus en
+# multi-processus : pas de fetchs en double, le débit Chess.com reste celui d'un seul token bucket
+UPDATE_LOCK = InterProcessLock(UPDATE_LOCK_PATH) if MULTIPROCESS_ENABLED else threading.RLock()
+
+# Horodatage (epoch) du dernier rafraîchissement réussi par joueur, pour mesurer la fraîcheur
+_last_refreshed = {}
+
+# Joueurs dont le dernier fetch a échoué (ou a été différé) : servis en tête au prochain cycle
+_retry_first = {}
+
+# En multi-processus, ces deux états vivent dans un fichier commun : tous les workers voient la même
+# fraîcheur et un nouveau leader reprend les joueurs à retenter (écrit sous UPDATE_LOCK)
+_shared_state = SharedState(UPDATE_STATE_PATH) if MULTIPROCESS_ENABLED else None
+
+def _load_update_state():
+    """Recharge _last_refreshed / _retry_first si un autre worker a écrit l'état partagé."""
+    global _last_refreshed, _retry_first
+    if _shared_state is None or not _shared_state.changed():
+        return
+    data = _shared_state.read()
+    # Nouveaux dicts plutôt que clear/update : un lecteur concurrent garde une vue cohérente
+    _last_refreshed = dict(data.get('refreshed', {}))
+    _retry_first = dict.fromkeys(data.get('retry', ()), True)
+
+def _save_update_state():
+    if _shared_state is not None:
+        _shared_state.write({'refreshed': _last_refreshed, 'retry': list(_retry_first)})
+
 def should_run_update():
     """
     Vérifie si la mise à jour doit s'exécuter selon les horaires.
@@ -70,7 +107,7 @@ def update_player_rank(players):
         Liste triée
     """
     # Trier par score Rapid décroissant
-    sorted_players = sorted(players, key=lambda x: x.get('rapid', {}).get('current', 0), reverse=True)
+    sorted_players = sorted(players, key=rating_key('rapid'), reverse=True)
 
     # Sauvegarder les rangs actuels dans previousRank
     for idx, player in enumerate(sorted_players):
@@ -110,123 +147,433 @@ def update_history_7days(player, new_current):
     logger.info(f"Updated history for {player.get('username')}: added {new_current} for {today}")
     return player
 
-def update_all_players():
+def build_new_player(username, first_name, last_name, promo, classe, new_stats):
     """
-    Fonction principale de mise à jour :
-    1. Vérifier horaires
-    2. Charger players.json
-    3. Supprimer promos expirées
-    4. Mettre à jour previousRank
-    5. Récupérer nouvelles stats Chess.com (avec rate limiting)
-    6. Mettre à jour history7days
-    7. Re-trier
-    8. Sauvegarder atomiquement
+    Construit l'entrée roster d'un nouveau joueur à partir de ses stats Chess.com
+    (historique 7 jours initialisé avec le score Rapid courant).
+    """
+    rapid_current = new_stats['rapid']['current']
+    return {
+        "username": username,
+        "firstName": first_name,
+        "lastName": last_name,
+        "promo": promo,
+        "class": classe,
+        "previousRank": 0,
+        "rapid": new_stats['rapid'],
+        "blitz": new_stats['blitz'],
+        "history7days": [rapid_current] * 7,
+        "lastHistoryUpdate": datetime.now().date().isoformat(),
+        "stats": new_stats['stats'],
+        "avatar": new_stats['avatar']
+    }
+
+def mark_refreshed(usernames, when=None):
+    """Enregistre l'instant du dernier rafraîchissement réussi des joueurs."""
+    when = time.time() if when is None else when
+    _load_update_state()
+    for username in usernames:
+        _last_refreshed[username] = when
+    _save_update_state()
+
+def get_staleness(now=None):
+    """
+    Ancienneté des données de chaque joueur du roster.
 
     Returns:
-        dict avec résumé de l'opération
+        dict {maxSeconds, avgSeconds, neverRefreshed, players: {username: secondes ou None}}
     """
-    logger.info("=== Starting update_all_players ===")
-
-    # 1. Vérifier horaires
-    if not should_run_update():
-        return {"success": False, "message": "Outside working hours"}
-
-    # SECTION CRITIQUE: Protéger toute la mise à jour avec le lock
-    with PLAYERS_JSON_LOCK:
-        # 2. Charger données actuelles
-        try:
-            with open(JSON_PATH, 'r', encoding='utf-8') as f:
-                players = json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load players.json: {e}")
-            return {"success": False, "error": str(e)}
-
-        initial_count = len(players)
-        logger.info(f"Loaded {initial_count} players")
-
-        # 3. Supprimer promos expirées
-        players, removed_count = remove_expired_promos(players)
+    now = time.time() if now is None else now
+    _load_update_state()
+    players = {}
+    for username in PLAYER_STORE.usernames():
+        refreshed_at = _last_refreshed.get(username)
+        players[username] = round(now - refreshed_at, 1) if refreshed_at else None
+    ages = [age for age in players.values() if age is not None]
+    return {
+        "maxSeconds": max(ages) if ages else None,
+        "avgSeconds": round(sum(ages) / len(ages), 1) if ages else None,
+        "neverRefreshed": len(players) - len(ages),
+        "players": players
+    }
+
+def pending_retries():
+    """Usernames en échec au dernier passage, dans l'ordre des échecs."""
+    _load_update_state()
+    return list(_retry_first)
+
+def _retry_order(usernames):
+    """Place les joueurs en échec au dernier passage en tête, sans changer l'ordre des autres."""
+    _load_update_state()
+    retry = [u for u in usernames if u in _retry_first]
+    if not retry:
+        return list(usernames)
+    retry_set = set(retry)
+    return retry + [u for u in usernames if u not in retry_set]
+
+def _forget_removed_players(version):
+    """
+    Listener du store : l'avatar en cache d'un joueur supprimé (Slack, POST
+    /api/players, promo expirée...) est oublié, un re-ajout relit son profil.
+    """
+    entry = PLAYER_STORE.changelog[-1]
+    if entry['version'] != version:
+        return
+    for username in entry['removed']:
+        PROFILE_CACHE.invalidate(username)
 
-        # 4. Mettre à jour previousRank (avant récupération nouvelles stats)
-        players = update_player_rank(players)
+PLAYER_STORE.add_listener(_forget_removed_players)
 
-        # 5. Récupérer nouvelles stats Chess.com
-        success_count = 0
-        error_count = 0
+def _history_point(player):
+    return (player['username'], player.get('rapid', {}).get('current', 0), player.get('blitz', {}).get('current', 0))
 
-        for idx, player in enumerate(players):
-            username = player.get('username')
-            if not username:
-                continue
+def _fetch_player(username):
+    """Tâche du pool : stats conditionnelles + avatar (cache TTL, cadence séparée)."""
+    stats = fetch_player_stats(username, report_deferred=True, with_avatar=False)
+    avatar = get_player_avatar(username) if _fetched(stats) else None
+    return stats, avatar
 
-            logger.info(f"Updating {username} ({idx+1}/{len(players)})")
+def _fetched(stats):
+    """True si Chess.com a répondu (stats ou 304), False en cas d'erreur ou d'appel différé."""
+    return stats is not None and stats is not DEFERRED
 
-            # Rate limiting
-            if idx > 0:
-                time.sleep(RATE_LIMIT_DELAY_SECONDS)
+def fetch_stats_concurrently(usernames):
+    """
+    Récupère les stats Chess.com de plusieurs joueurs avec un pool de threads borné.
+    Le débit est contrôlé par le token bucket global de chess_api (pas de sleep fixe) :
+    la durée d'un cycle dépend du débit autorisé, pas de la latence × N.
+    Les joueurs en échec au passage précédent sont soumis en premier ; si le
+    disjoncteur s'ouvre en cours de route, les suivants sont différés sans appel réseau.
 
-            # Récupérer nouvelles stats
-            new_stats = fetch_player_stats(username)
+    Args:
+        usernames: Liste des usernames à récupérer
 
-            if new_stats:
-                # Mettre à jour seulement si récupération réussie
-                player['rapid'] = new_stats['rapid']
-                player['blitz'] = new_stats['blitz']
+    Returns:
+        dict {username: (stats, avatar)} où stats vaut un dict (corps en cache sur un 304),
+        DEFERRED (disjoncteur ouvert, pas d'appel) ou None en cas d'erreur, et
+        avatar vaut l'URL en cache/rafraîchie ou None
+    """
+    results = {}
+    if not usernames:
+        return results
+
+    total = len(usernames)
+    max_workers = max(1, min(UPDATE_MAX_WORKERS, total))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chess-fetch') as executor:
+        futures = {executor.submit(_fetch_player, username): username for username in _retry_order(usernames)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            username = futures[future]
+            try:
+                results[username] = future.result()
+            except Exception as e:
+                logger.error(f"Unexpected error fetching {username}: {e}")
+                results[username] = (None, None)
+            logger.info(f"Fetched {username} ({done}/{total})")
+
+    _load_update_state()
+    for username, (stats, _) in results.items():
+        if not _fetched(stats):
+            _retry_first[username] = True
+        else:
+            _retry_first.pop(username, None)
+    _save_update_state()
+    return results
 
-                # Garder le meilleur score rapid historique
-                if 'rapid' in player and 'best' in player['rapid']:
-                    player['rapid']['best'] = max(player['rapid'].get('best', 0), new_stats['rapid']['best'])
+def merge_player_stats(player, new_stats, avatar):
+    """
+    Fusionne le résultat d'un fetch dans le dictionnaire du joueur.
 
-                # Garder le meilleur score blitz historique
-                if 'blitz' in player and 'best' in player['blitz']:
-                    player['blitz']['best'] = max(player['blitz'].get('best', 0), new_stats['blitz']['best'])
+    Args:
+        player: Dictionnaire du joueur (modifié en place)
+        new_stats: dict de stats, DEFERRED ou None
+        avatar: URL de l'avatar ou None
 
-                player['stats'] = new_stats['stats']
-                if new_stats['avatar']:
-                    player['avatar'] = new_stats['avatar']
+    Returns:
+        tuple (statut, modifié) avec statut 'updated', 'unchanged' (stats
+        identiques à l'enregistrement, ex: 304), 'deferred' (jamais tenté,
+        disjoncteur ouvert) ou 'error'
+    """
+    username = player.get('username')
+    changed = False
+
+    # Avatar : rafraîchi selon sa propre cadence, indépendamment des stats
+    if avatar and avatar != player.get('avatar'):
+        player['avatar'] = avatar
+        changed = True
+
+    if new_stats is DEFERRED:
+        # Appel refusé par le disjoncteur : pas un échec, le joueur passe en tête au prochain cycle
+        return 'deferred', changed
+
+    if not new_stats:
+        # Conserver anciennes stats en cas d'erreur
+        logger.warning(f"Failed to update {username}, keeping old stats")
+        return 'error', changed
+
+    # Mettre à jour seulement si récupération réussie. Un 304 renvoie le corps en cache :
+    # la comparaison se fait avec l'enregistrement du roster, pas avec la dernière réponse
+    before = (player.get('rapid'), player.get('blitz'), player.get('stats'), player.get('lastHistoryUpdate'))
+    player['rapid'] = new_stats['rapid']
+    player['blitz'] = new_stats['blitz']
+
+    # Garder le meilleur score rapid historique
+    if 'rapid' in player and 'best' in player['rapid']:
+        player['rapid']['best'] = max(player['rapid'].get('best', 0), new_stats['rapid']['best'])
+
+    # Garder le meilleur score blitz historique
+    if 'blitz' in player and 'best' in player['blitz']:
+        player['blitz']['best'] = max(player['blitz'].get('best', 0), new_stats['blitz']['best'])
+
+    player['stats'] = new_stats['stats']
+
+    # Mettre à jour history (basé sur Rapid)
+    update_history_7days(player, new_stats['rapid']['current'])
+    after = (player.get('rapid'), player.get('blitz'), player.get('stats'), player.get('lastHistoryUpdate'))
+    if after[:3] == before[:3]:
+        return 'unchanged', changed or after[3] != before[3]
+    return 'updated', True
+
+@profiled('update_all_players')
+def update_all_players(wait=True):
+    """
+    Fonction principale de mise à jour (protocole snapshot-and-merge) :
+    1. Vérifier horaires
+    2. Snapshot des usernames depuis le PlayerStore (lock tenu quelques millisecondes)
+    3. Récupérer nouvelles stats Chess.com SANS le lock (en parallèle, avec rate limiting)
+    4. Section critique courte : relire le roster courant, supprimer promos expirées,
+       mettre à jour previousRank, fusionner par username, filtrer, re-trier, sauvegarder
 
-                # Mettre à jour history (basé sur Rapid)
-                player = update_history_7days(player, new_stats['rapid']['current'])
+    Les joueurs ajoutés pendant le fetch sont conservés tels quels, ceux supprimés
+    pendant le fetch sont ignorés à la fusion.
 
-                success_count += 1
-            else:
-                # Conserver anciennes stats en cas d'erreur
-                logger.warning(f"Failed to update {username}, keeping old stats")
-                error_count += 1
+    Args:
+        wait: Si False et qu'un autre cycle tourne (ce processus ou un autre
+            worker), retourne tout de suite avec `busy: True` au lieu d'attendre
 
-        # 6. Supprimer les joueurs sans score Rapid (n'ont pas joué de parties Rapid)
-        before_filter = len(players)
-        players = [p for p in players if p.get('rapid', {}).get('current', 0) > 0]
-        filtered_count = before_filter - len(players)
+    Returns:
+        dict avec résumé de l'opération
+    """
+    if not UPDATE_LOCK.acquire(wait):
+        logger.info("Update already running, skipped")
+        UPDATE_CYCLES.inc(cycle='full', result='busy')
+        return {"success": False, "message": "Update already running", "busy": True}
+    try:
+        return _update_all_players()
+    finally:
+        UPDATE_LOCK.release()
+
+def _update_all_players():
+    logger.info("=== Starting update_all_players ===")
+    # 1. Vérifier horaires
+    if not should_run_update():
+        UPDATE_CYCLES.inc(cycle='full', result='skipped')
+        return {"success": False, "message": "Outside working hours"}
+    if CHESS_API_BREAKER.state == 'open':
+        logger.warning("Chess.com circuit open, update deferred")
+        UPDATE_CYCLES.inc(cycle='full', result='deferred')
+        return {"success": False, "message": "Chess.com circuit open", "deferred": len(PLAYER_STORE)}
+
+    with UPDATE_PHASE_SECONDS.time(cycle='full', phase='total'):
+        result = _run_full_update()
+    UPDATE_CYCLES.inc(cycle='full', result='success' if result.get('success') else 'failure')
+    return result
+
+def _run_full_update():
+    """Corps de update_all_players (étapes 2 à 4), chaque phase est chronométrée."""
+    started_at = time.monotonic()
+
+    # 2. Snapshot du roster
+    with UPDATE_PHASE_SECONDS.time(cycle='full', phase='load'), \
+            timed_lock(PLAYER_STORE.lock, "update_all_players/snapshot"):
+        try:
+            snapshot = PLAYER_STORE.get_players()
+        except Exception as e:
+            logger.error(f"Failed to load players.json: {e}")
+            return {"success": False, "error": str(e), "deferred": 0}
+
+    usernames = [p['username'] for p in snapshot if p.get('username')]
+    logger.info(f"Snapshot: {len(usernames)} players to refresh (roster v{PLAYER_STORE.version})")
+
+    # Les avatars déjà connus amorcent le cache TTL (pas de rafale d'appels profil au démarrage)
+    for player in snapshot:
+        if player.get('username') and player.get('avatar'):
+            PROFILE_CACHE.seed(player['username'], player['avatar'])
+    profile_hits_before = PROFILE_CACHE.stats()['hits']
+
+    # 3. Récupérer nouvelles stats Chess.com (requêtes conditionnelles, hors lock)
+    with UPDATE_PHASE_SECONDS.time(cycle='full', phase='fetch'):
+        all_stats = fetch_stats_concurrently(usernames)
+    profile_skipped = PROFILE_CACHE.stats()['hits'] - profile_hits_before
+    mark_refreshed(u for u, (stats, _) in all_stats.items() if _fetched(stats))
+
+    # 4. Fusion dans une section critique courte
+    with timed_lock(PLAYER_STORE.lock, "update_all_players/merge"):
+        with UPDATE_PHASE_SECONDS.time(cycle='full', phase='prune'):
+            players = PLAYER_STORE.get_players()
+
+            # Supprimer promos expirées
+            players, removed_count = remove_expired_promos(players)
+
+            # Mettre à jour previousRank (avant application des nouvelles stats)
+            players = update_player_rank(players)
+
+        with UPDATE_PHASE_SECONDS.time(cycle='full', phase='merge'):
+            counts = {'updated': 0, 'unchanged': 0, 'deferred': 0, 'error': 0}
+            dirty = False
+            history_points = []
+            for player in players:
+                username = player.get('username')
+                if username not in all_stats:
+                    # Ajouté pendant le fetch : conservé tel quel
+                    continue
+                new_stats, avatar = all_stats[username]
+                status, changed = merge_player_stats(player, new_stats, avatar)
+                counts[status] += 1
+                dirty = dirty or changed
+                if status in ('updated', 'unchanged'):
+                    history_points.append(_history_point(player))
+        deferred = counts['deferred']
+        if deferred:
+            logger.warning(f"{deferred} players deferred by open Chess.com circuit, retried first next cycle")
+
+        # Supprimer les joueurs sans score Rapid (n'ont pas joué de parties Rapid)
+        with UPDATE_PHASE_SECONDS.time(cycle='full', phase='filter'):
+            before_filter = len(players)
+            players = [p for p in players if p.get('rapid', {}).get('current', 0) > 0]
+            filtered_count = before_filter - len(players)
         if filtered_count > 0:
             logger.info(f"Removed {filtered_count} players with no Rapid games")
 
-        # 7. Re-trier après mises à jour (par score Rapid)
-        players = sorted(players, key=lambda x: x.get('rapid', {}).get('current', 0), reverse=True)
+        # Re-trier après mises à jour (par score Rapid)
+        with UPDATE_PHASE_SECONDS.time(cycle='full', phase='sort'):
+            players = sorted(players, key=rating_key('rapid'), reverse=True)
+
+        if counts['updated'] == 0 and counts['unchanged'] == 0:
+            logger.error(f"No successful updates ({counts['error']} errors, {deferred} deferred), not saving file")
+            return {"success": False, "message": "No successful updates", "errors": counts['error'], "deferred": deferred}
 
-        # 8. Sauvegarder atomiquement (temp file + rename)
-        if success_count > 0:
+        # Sauvegarder seulement si quelque chose a changé
+        if dirty or removed_count > 0 or filtered_count > 0:
             try:
-                temp_path = JSON_PATH.with_suffix('.json.tmp')
-                with open(temp_path, 'w', encoding='utf-8') as f:
-                    json.dump(players, f, indent=2, ensure_ascii=False)
-
-                # Rename atomique
-                if temp_path.exists():
-                    shutil.move(str(temp_path), str(JSON_PATH))
-
-                logger.info(f"✓ Update complete: {success_count} success, {error_count} errors, {removed_count} expired, {filtered_count} no games")
-                return {
-                    "success": True,
-                    "updated": success_count,
-                    "errors": error_count,
-                    "removed": removed_count,
-                    "filtered": filtered_count,
-                    "total": len(players)
-                }
+                with UPDATE_PHASE_SECONDS.time(cycle='full', phase='save'):
+                    PLAYER_STORE.replace_all(players)
             except Exception as e:
                 logger.error(f"Failed to save players.json: {e}")
-                return {"success": False, "error": str(e)}
+                return {"success": False, "error": str(e), "deferred": deferred}
         else:
-            logger.error("No successful updates, not saving file")
-            return {"success": False, "message": "No successful updates"}
+            logger.info("No changes since last update, players.json left untouched")
+
+    # Historique long terme (hors lock : écritures disque par joueur)
+    with UPDATE_PHASE_SECONDS.time(cycle='full', phase='timeseries'):
+        TIMESERIES.record(history_points)
+
+    duration = time.monotonic() - started_at
+    http_stats = get_http_stats()
+    logger.info(f"✓ Update complete in {duration:.1f}s: {counts['updated']} success, {counts['unchanged']} unchanged, {counts['error']} errors, {deferred} deferred, {removed_count} expired, {filtered_count} no games")
+    logger.info(f"HTTP connections: {http_stats['connections_opened']} opened, {http_stats['connections_reused']} reused")
+    logger.info(f"Profile fetches skipped (TTL cache): {profile_skipped}")
+    return {
+        "success": True,
+        "updated": counts['updated'],
+        "unchanged": counts['unchanged'],
+        "errors": counts['error'],
+        "removed": removed_count,
+        "filtered": filtered_count,
+        "profileSkipped": profile_skipped,
+        "deferred": deferred,
+        "circuit": CHESS_API_BREAKER.state,
+        "total": len(players),
+        "duration": round(duration, 2),
+        "http": http_stats
+    }
+
+def refresh_players(usernames, label="refresh_players"):
+    """
+    Rafraîchit un sous-ensemble du roster (schedulers adaptatif / glissant).
+
+    Même protocole que update_all_players (fetch hors lock, fusion courte par
+    username) mais sans toucher à previousRank : les rangs de référence sont
+    figés par refresh_ranks() une fois par UPDATE_INTERVAL_MINUTES.
+
+    Args:
+        usernames: Usernames à rafraîchir
+        label: Nom de la section critique (logs)
+
+    Returns:
+        dict {username: {status, ratingChanged, lastPlayed}} pour les joueurs
+        encore présents dans le roster au moment de la fusion
+    """
+    if not usernames:
+        return {}
+    with UPDATE_LOCK:
+        return _refresh_players(usernames, label)
+
+def _refresh_players(usernames, label):
+    for username in usernames:
+        avatar = (PLAYER_STORE.get(username) or {}).get('avatar')
+        if avatar:
+            PROFILE_CACHE.seed(username, avatar)
+
+    with UPDATE_PHASE_SECONDS.time(cycle='partial', phase='fetch'):
+        all_stats = fetch_stats_concurrently(usernames)
+    mark_refreshed(u for u, (stats, _) in all_stats.items() if _fetched(stats))
+
+    results = {}
+    with UPDATE_PHASE_SECONDS.time(cycle='partial', phase='merge'), \
+            timed_lock(PLAYER_STORE.lock, f"{label}/merge"):
+        changed_players = []
+        no_rapid = []
+        history_points = []
+        for username in usernames:
+            player = PLAYER_STORE.get(username)
+            if player is None:
+                # Supprimé pendant le fetch
+                continue
+            new_stats, avatar = all_stats.get(username, (None, None))
+            old_ratings = (player.get('rapid', {}).get('current', 0), player.get('blitz', {}).get('current', 0))
+            status, changed = merge_player_stats(player, new_stats, avatar)
+            new_ratings = (player.get('rapid', {}).get('current', 0), player.get('blitz', {}).get('current', 0))
+
+            if status == 'updated' and new_ratings[0] <= 0:
+                # Pas de parties Rapid : retiré comme dans update_all_players
+                no_rapid.append(username)
+            elif changed:
+                changed_players.append(player)
+
+            if status in ('updated', 'unchanged'):
+                history_points.append(_history_point(player))
+            results[username] = {
+                "status": status,
+                "ratingChanged": status == 'updated' and new_ratings != old_ratings,
+                "lastPlayed": new_stats.get('lastPlayed', 0) if isinstance(new_stats, dict) else None
+            }
+
+        if changed_players or no_rapid:
+            try:
+                with UPDATE_PHASE_SECONDS.time(cycle='partial', phase='save'):
+                    PLAYER_STORE.upsert_players(changed_players, no_rapid)
+            except Exception as e:
+                logger.error(f"Failed to save refreshed players: {e}")
+
+    with UPDATE_PHASE_SECONDS.time(cycle='partial', phase='timeseries'):
+        TIMESERIES.record(history_points)
+    if no_rapid:
+        logger.info(f"Removed {len(no_rapid)} players with no Rapid games: {no_rapid}")
+    return results
+
+def refresh_ranks():
+    """
+    Maintenance périodique des modes de rafraîchissement partiels : supprime les
+    promos expirées et fige previousRank sur le classement courant (ce que fait
+    update_all_players au début de chaque cycle complet).
+    """
+    if not should_run_update():
+        return
+    with timed_lock(PLAYER_STORE.lock, "refresh_ranks"):
+        players = PLAYER_STORE.get_players()
+        players, removed_count = remove_expired_promos(players)
+        players = update_player_rank(players)
+        try:
+            PLAYER_STORE.replace_all(players)
+        except Exception as e:
+            logger.error(f"Failed to save ranks: {e}")
@@ -0,0 +1,91 @@
+# Disjoncteur (circuit breaker) partagé entre threads
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Levée quand un appel est refusé parce que le disjoncteur est ouvert."""
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états :
+    - closed : les appels passent ; `failure_threshold` échecs consécutifs l'ouvrent
+    - open : les appels sont refusés pendant `reset_timeout` secondes
+    - half_open : un seul appel test passe, les autres sont refusés jusqu'à son
+      résultat ; un succès le referme, un échec le rouvre
+
+    Le compteur `rejected` permet de mesurer les appels différés.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now):
+        # Sans effet de bord : la bascule en half_open se fait dans allow(), avec l'appel test
+        if self._state == 'open' and now - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return self._state
+
+    def allow(self):
+        """
+        Retourne True si un appel peut être tenté (et compte les refus). En
+        half_open, seul le premier appelant passe : il porte l'appel test.
+        """
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probe_in_flight:
+                if self._state == 'open':
+                    logger.info(f"Circuit {self.name} half-open: probing")
+                self._state = 'half_open'
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def check(self):
+        """Lève CircuitOpenError si le disjoncteur refuse l'appel."""
+        if not self.allow():
+            raise CircuitOpenError(f"circuit {self.name} is open")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != 'closed':
+                logger.info(f"Circuit {self.name} closed")
+            self._state = 'closed'
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Appel sans verdict (429...) : l'appel test suivant peut partir, état inchangé."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state(time.monotonic())
+            if state == 'half_open' or (state == 'closed' and self._failures >= self.failure_threshold):
+                self._state = 'open'
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+                logger.warning(f"Circuit {self.name} opened after {self._failures} consecutive failures, retry in {self.reset_timeout}s")
+
+    def stats(self):
+        return {"state": self.state, "failures": self._failures, "rejected": self.rejected}
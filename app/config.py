@@ -5,27 +5,113 @@ import threading
 
 # Chemins
 BASE_DIR = Path(__file__).parent.parent  # Remonter au dossier racine (ChessAPI/)
-JSON_PATH = BASE_DIR / "data" / "players.json"
+JSON_PATH = Path(os.environ.get('PLAYERS_JSON_PATH', BASE_DIR / "data" / "players.json"))
+# État interne (caches...) : hors de data/ qui est servi publiquement
+STATE_DIR = Path(os.environ.get('STATE_DIR', BASE_DIR / "var"))
 
-# Lock pour protéger l'accès concurrent à players.json
-PLAYERS_JSON_LOCK = threading.Lock()
+# Backend de persistance du roster : 'json' (players.json réécrit en entier),
+# 'sqlite' (upserts, WAL) ou 'journal' (snapshot players.json + journal append-only)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'json').lower()
+SQLITE_PATH = Path(os.environ.get('SQLITE_PATH', STATE_DIR / "players.db"))
+SQLITE_EXPORT_SECONDS = int(os.environ.get('SQLITE_EXPORT_SECONDS', 60))  # Export players.json différé
+JOURNAL_PATH = STATE_DIR / "players.journal"
+JOURNAL_COMPACT_MINUTES = int(os.environ.get('JOURNAL_COMPACT_MINUTES', 10))
+JOURNAL_COMPACT_MAX_RECORDS = int(os.environ.get('JOURNAL_COMPACT_MAX_RECORDS', 5000))
+
+# Nombre de versions du roster conservées dans le journal des changements (deltas clients)
+CHANGELOG_SIZE = int(os.environ.get('CHANGELOG_SIZE', 100))
+
+# Historique long terme des classements (séries binaires par joueur, hors players.json)
+TIMESERIES_ENABLED = os.environ.get('TIMESERIES_ENABLED', 'true').lower() == 'true'
+TIMESERIES_DIR = STATE_DIR / "timeseries"
+TIMESERIES_STEP_MINUTES = int(os.environ.get('TIMESERIES_STEP_MINUTES', 60))  # Pas de la série brute
+TIMESERIES_RAW_RETENTION_DAYS = int(os.environ.get('TIMESERIES_RAW_RETENTION_DAYS', 35))
+TIMESERIES_DAILY_RETENTION_DAYS = int(os.environ.get('TIMESERIES_DAILY_RETENTION_DAYS', 1095))
+
+# Lock pour protéger l'accès concurrent à players.json (ré-entrant : tenu par les appelants du PlayerStore)
+PLAYERS_JSON_LOCK = threading.RLock()
+
+# Déploiement multi-processus (plusieurs workers gunicorn, voir wsgi.py) : lock fichier entre processus,
+# roster rechargé quand un autre processus l'a modifié, un seul processus leader (scheduler + SSE)
+MULTIPROCESS_ENABLED = os.environ.get('MULTIPROCESS_ENABLED', 'false').lower() == 'true'
+ROSTER_LOCK_PATH = STATE_DIR / "roster.lock"
+ROSTER_GENERATION_PATH = STATE_DIR / "roster.generation"
+LEADER_LEASE_PATH = STATE_DIR / "leader.lock"
+UPDATE_LOCK_PATH = STATE_DIR / "update.lock"  # Un seul cycle de fetch Chess.com à la fois, tous workers confondus
+UPDATE_STATE_PATH = STATE_DIR / "update_state.json"  # Fraîcheur et joueurs à retenter, communs aux workers
+LEADER_RETRY_SECONDS = int(os.environ.get('LEADER_RETRY_SECONDS', 15))  # Tentative de reprise par les followers
+ROSTER_SYNC_SECONDS = int(os.environ.get('ROSTER_SYNC_SECONDS', 2))  # Relecture par le leader (push SSE)
 
 # Slack
 SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
+SLACK_API_BASE_URL = os.environ.get('SLACK_API_BASE_URL', 'https://slack.com/api').rstrip('/')
+SLACK_API_TIMEOUT = float(os.environ.get('SLACK_API_TIMEOUT', 5))  # secondes
+# Annuaire des utilisateurs Slack : noms en cache, préchargés en masse via users.list
+SLACK_USER_CACHE_TTL_MINUTES = int(os.environ.get('SLACK_USER_CACHE_TTL_MINUTES', 60))
+SLACK_DIRECTORY_WARMUP = os.environ.get('SLACK_DIRECTORY_WARMUP', 'true').lower() == 'true'
+SLACK_WORKERS = int(os.environ.get('SLACK_WORKERS', 4))  # Workers traitant les commandes en arrière-plan
+SLACK_QUEUE_SIZE = int(os.environ.get('SLACK_QUEUE_SIZE', 100))  # Commandes en attente au-delà desquelles on refuse
+SLACK_COMMIT_WINDOW_MS = int(os.environ.get('SLACK_COMMIT_WINDOW_MS', 200))  # Fenêtre de regroupement des commits
+
+# Client HTTP partagé (keep-alive)
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 4))  # Nombre d'hôtes gardés en pool
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))  # Connexions conservées par hôte
+
+# Cache disque des réponses Chess.com (requêtes conditionnelles ETag / Last-Modified)
+HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTP_CACHE_DIR = STATE_DIR / "http_cache"
 
 # Chess.com API
-CHESS_API_BASE_URL = "https://api.chess.com/pub/player"
+CHESS_API_BASE_URL = os.environ.get('CHESS_API_BASE_URL', "https://api.chess.com/pub/player")
 CHESS_API_TIMEOUT = 5
 CHESS_API_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
 
+# Rafraîchissement des profils (avatar) : cadence séparée de celle des classements
+PROFILE_CACHE_TTL_HOURS = float(os.environ.get('PROFILE_CACHE_TTL_HOURS', 24))
+
 # Scheduler
 UPDATE_INTERVAL_MINUTES = int(os.environ.get('UPDATE_INTERVAL_MINUTES', 5))
-RATE_LIMIT_DELAY_SECONDS = float(os.environ.get('RATE_LIMIT_DELAY_SECONDS', 1.0))
+# 'full' : tout le roster à chaque intervalle ; 'priority' : échéance par joueur selon son activité ;
+# 'rolling' : roster rafraîchi par tranches en continu (chaque joueur une fois par intervalle)
+SCHEDULER_MODE = os.environ.get('SCHEDULER_MODE', 'full').lower()
+ROLLING_TICK_SECONDS = int(os.environ.get('ROLLING_TICK_SECONDS', 15))
+PRIORITY_TICK_SECONDS = int(os.environ.get('PRIORITY_TICK_SECONDS', 30))
+PRIORITY_MIN_INTERVAL_MINUTES = int(os.environ.get('PRIORITY_MIN_INTERVAL_MINUTES', 5))
+PRIORITY_MAX_INTERVAL_MINUTES = int(os.environ.get('PRIORITY_MAX_INTERVAL_MINUTES', 24 * 60))
+
+# Rate limiting global (token bucket partagé par tous les appels Chess.com)
+CHESS_API_RATE_LIMIT = float(os.environ.get('CHESS_API_RATE_LIMIT', 3.0))  # requêtes/seconde
+CHESS_API_BURST = int(os.environ.get('CHESS_API_BURST', 5))
+UPDATE_MAX_WORKERS = int(os.environ.get('UPDATE_MAX_WORKERS', 4))  # Requêtes en vol simultanées
+
+# Résilience Chess.com : backoff sur 429, disjoncteur sur 5xx / timeouts
+CHESS_API_MAX_RETRIES = int(os.environ.get('CHESS_API_MAX_RETRIES', 3))
+CHESS_API_BACKOFF_BASE_SECONDS = float(os.environ.get('CHESS_API_BACKOFF_BASE_SECONDS', 2))
+CHESS_API_BACKOFF_MAX_SECONDS = float(os.environ.get('CHESS_API_BACKOFF_MAX_SECONDS', 60))
+CHESS_API_BREAKER_THRESHOLD = int(os.environ.get('CHESS_API_BREAKER_THRESHOLD', 5))  # Échecs consécutifs
+CHESS_API_BREAKER_RESET_SECONDS = int(os.environ.get('CHESS_API_BREAKER_RESET_SECONDS', 120))
+
+# Push des mises à jour du classement (Server-Sent Events, boucle asyncio sur un port dédié)
+SSE_ENABLED = os.environ.get('SSE_ENABLED', 'true').lower() == 'true'
+SSE_HOST = os.environ.get('SSE_HOST', '0.0.0.0')
+SSE_PORT = int(os.environ.get('SSE_PORT', 5001))
+SSE_PUBLIC_URL = os.environ.get('SSE_PUBLIC_URL')  # URL publique du flux, obligatoire derrière un reverse proxy ou en HTTPS
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 25))
+SSE_MAX_CLIENTS = int(os.environ.get('SSE_MAX_CLIENTS', 2000))
+
+# Profilage à la demande (cProfile / tracemalloc), désactivé par défaut : '', 'cpu', 'memory' ou 'both'
+PROFILING_MODE = os.environ.get('PROFILING_MODE', '').lower()
+PROFILING_SAMPLE_RATE = int(os.environ.get('PROFILING_SAMPLE_RATE', 10))  # 1 exécution profilée sur N
+PROFILING_DIR = Path(os.environ.get('PROFILING_DIR', STATE_DIR / "profiles"))
+PROFILING_KEEP = int(os.environ.get('PROFILING_KEEP', 20))  # Profils conservés sur disque
+# Routes Flask profilées (noms des fonctions de vue), en plus de update_all_players
+PROFILING_ROUTES = [r.strip() for r in os.environ.get('PROFILING_ROUTES', 'serve_data,leaderboard,leaderboard_changes').split(',') if r.strip()]
 
 # Horaires de fonctionnement
 SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
-WORKING_DAYS = [0, 1, 2, 3, 4]  # Lundi-Vendredi (0=lundi, 6=dimanche)
-START_HOUR = 6   # 6h du matin
+# Lundi-Vendredi par défaut (0=lundi, 6=dimanche)
+WORKING_DAYS = [int(d) for d in os.environ.get('WORKING_DAYS', '0,1,2,3,4').split(',') if d.strip()]
+START_HOUR = int(os.environ.get('START_HOUR', 6))   # 6h du matin
 END_HOUR = 0     # Minuit (00h)
@@ -0,0 +1,76 @@
+# Cache disque des réponses HTTP avec validateurs (ETag / Last-Modified)
+import hashlib
+import json
+import logging
+import os
+import threading
+from .config import HTTP_CACHE_DIR, HTTP_CACHE_ENABLED
+
+logger = logging.getLogger(__name__)
+
+class ConditionalCache:
+    """
+    Cache de réponses indexé par URL, un fichier JSON par URL.
+
+    Chaque entrée contient les validateurs renvoyés par le serveur (ETag,
+    Last-Modified) et le corps brut, pour pouvoir envoyer des requêtes
+    conditionnelles (If-None-Match / If-Modified-Since) et réutiliser le
+    corps sur un 304.
+    """
+
+    def __init__(self, directory, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, url):
+        """Retourne l'entrée {url, etag, last_modified, body} ou None."""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry if entry.get('url') == url else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Corrupted cache entry for {url}: {e}")
+            return None
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Construit les en-têtes conditionnels à partir d'une entrée de cache."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, resp):
+        """Enregistre une réponse 200 si elle porte au moins un validateur."""
+        if not self.enabled:
+            return
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        entry = {"url": url, "etag": etag, "last_modified": last_modified, "body": resp.text}
+        path = self._path(url)
+        temp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry for {url}: {e}")
+
+# Instance globale utilisée par chess_api
+RESPONSE_CACHE = ConditionalCache(HTTP_CACHE_DIR, enabled=HTTP_CACHE_ENABLED)
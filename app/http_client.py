@@ -0,0 +1,93 @@
+# Client HTTP partagé (pool de connexions keep-alive) pour tous les appels sortants
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from .config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE
+
+logger = logging.getLogger(__name__)
+
+# Compteurs globaux (protégés par _stats_lock)
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "connections_opened": 0}
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count("connections_opened")
+        return super()._new_conn()
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count("connections_opened")
+        return super()._new_conn()
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter qui compte les requêtes envoyées et les connexions TCP ouvertes."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _count("requests")
+        return super().send(request, **kwargs)
+
+# Session unique, créée à la demande
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Retourne la session HTTP partagée (créée au premier appel).
+
+    La session ne conserve aucun cookie : elle est sans état et peut donc être
+    utilisée simultanément par tous les threads (updater, workers Slack).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = _PooledAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+                logger.info(f"HTTP session created (pools={HTTP_POOL_CONNECTIONS}, maxsize={HTTP_POOL_MAXSIZE})")
+    return _session
+
+def get(url, **kwargs):
+    """Équivalent de requests.get via la session partagée."""
+    return get_session().get(url, **kwargs)
+
+def post(url, **kwargs):
+    """Équivalent de requests.post via la session partagée."""
+    return get_session().post(url, **kwargs)
+
+def get_http_stats():
+    """
+    Retourne les compteurs de connexions.
+
+    Returns:
+        dict avec {requests, connections_opened, connections_reused}
+    """
+    with _stats_lock:
+        sent = _stats["requests"]
+        opened = _stats["connections_opened"]
+    return {
+        "requests": sent,
+        "connections_opened": opened,
+        "connections_reused": max(0, sent - opened)
+    }
@@ -0,0 +1,175 @@
+# Import en masse de joueurs (CSV / NDJSON) : fetch concurrent, un seul commit
+import codecs
+import csv
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from .chess_api import fetch_player_stats
+from .chess_updater import build_new_player
+from .config import UPDATE_MAX_WORKERS
+from .locks import timed_lock
+from .player_store import PLAYER_STORE, name_key, username_key
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'ndjson')
+
+# Colonnes acceptées -> champ interne
+_ALIASES = {
+    'username': 'username', 'pseudo': 'username',
+    'promo': 'promo',
+    'class': 'class', 'classe': 'class',
+    'first': 'firstName', 'firstname': 'firstName', 'first_name': 'firstName',
+    'last': 'lastName', 'lastname': 'lastName', 'last_name': 'lastName'
+}
+_USERNAME = re.compile(r'^[A-Za-z0-9_-]{3,25}$')
+
+def _lines(stream):
+    """Décode un flux binaire ligne par ligne, sans le charger en entier."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer.rstrip('\r')
+
+def iter_rows(stream, fmt):
+    """
+    Parse le corps de la requête au fil de l'eau.
+
+    Yields:
+        tuple (numéro de ligne, dict brut ou None, erreur ou None)
+    """
+    if fmt == 'ndjson':
+        for lineno, line in enumerate(_lines(stream), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield lineno, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield lineno, None, "row must be a JSON object"
+                continue
+            yield lineno, row, None
+    else:
+        reader = csv.DictReader(_lines(stream))
+        for row in reader:
+            yield reader.line_num, row, None
+
+def validate_row(row):
+    """
+    Normalise et valide une ligne d'import.
+
+    Returns:
+        tuple (champs normalisés, erreur ou None)
+    """
+    fields = {'username': '', 'promo': '', 'class': '', 'firstName': '', 'lastName': ''}
+    for key, value in row.items():
+        field = _ALIASES.get(str(key or '').strip().lower())
+        if field and value is not None:
+            fields[field] = str(value).strip()
+    fields['class'] = fields['class'].upper()
+
+    if not _USERNAME.match(fields['username']):
+        return fields, f"invalid username: {fields['username']!r}"
+    if not re.match(r'^\d{4}$', fields['promo']):
+        return fields, f"invalid promo: {fields['promo']!r}"
+    if int(fields['promo']) <= datetime.now().year:
+        return fields, f"expired promo: {fields['promo']}"
+    return fields, None
+
+def _completed(pending, new_players, counts, block):
+    """Collecte les fetchs terminés (tous si `block`) et produit un événement par joueur."""
+    done = as_completed(list(pending)) if block else [f for f in list(pending) if f.done()]
+    for future in done:
+        lineno, fields = pending.pop(future)
+        try:
+            stats = future.result()
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {fields['username']}: {e}")
+            stats = None
+        if not stats:
+            counts['errors'] += 1
+            yield {"event": "row", "line": lineno, "username": fields['username'], "status": "error",
+                   "error": "Chess.com stats unavailable"}
+            continue
+        new_players.append(build_new_player(
+            fields['username'], fields['firstName'], fields['lastName'], fields['promo'], fields['class'], stats
+        ))
+        yield {"event": "row", "line": lineno, "username": fields['username'], "status": "fetched",
+               "rapid": stats['rapid']['current'], "blitz": stats['blitz']['current']}
+
+def import_players(rows):
+    """
+    Importe des joueurs en un seul passage :
+    1. validation et dédoublonnage (roster + fichier) au fil de la lecture
+    2. fetch Chess.com concurrent (pool borné, token bucket global)
+    3. un seul commit sous lock, doublons revérifiés
+
+    Args:
+        rows: itérable de (numéro de ligne, dict brut ou None, erreur ou None)
+
+    Yields:
+        événements de progression (dict), le dernier étant le résumé (`event: done`)
+    """
+    counts = {'rows': 0, 'invalid': 0, 'duplicates': 0, 'errors': 0, 'added': 0}
+    seen_usernames = set()
+    seen_names = set()
+    pending = {}  # future -> (ligne, champs)
+    new_players = []
+
+    with ThreadPoolExecutor(max_workers=max(1, UPDATE_MAX_WORKERS), thread_name_prefix='chess-import') as executor:
+        for lineno, row, error in rows:
+            counts['rows'] += 1
+            fields = None
+            if error is None:
+                fields, error = validate_row(row)
+            if error:
+                counts['invalid'] += 1
+                yield {"event": "row", "line": lineno, "status": "invalid", "error": error}
+                continue
+
+            username = fields['username']
+            key = name_key(fields['firstName'], fields['lastName'])
+            has_name = fields['firstName'] and fields['lastName']
+            if (username_key(username) in seen_usernames or PLAYER_STORE.exists(username)
+                    or (has_name and (key in seen_names
+                                      or PLAYER_STORE.find_by_name(fields['firstName'], fields['lastName'])))):
+                counts['duplicates'] += 1
+                yield {"event": "row", "line": lineno, "username": username, "status": "duplicate"}
+                continue
+            seen_usernames.add(username_key(username))
+            if has_name:
+                seen_names.add(key)
+
+            future = executor.submit(fetch_player_stats, username)
+            pending[future] = (lineno, fields)
+            yield from _completed(pending, new_players, counts, block=False)
+
+        yield from _completed(pending, new_players, counts, block=True)
+
+    # Un seul commit : revérifier les doublons ajoutés entre-temps (Slack, autre import)
+    with timed_lock(PLAYER_STORE.lock, "import"):
+        fresh = []
+        for player in new_players:
+            if PLAYER_STORE.exists(player['username']) or (
+                    player['firstName'] and player['lastName']
+                    and PLAYER_STORE.find_by_name(player['firstName'], player['lastName'])):
+                counts['duplicates'] += 1
+                continue
+            fresh.append(player)
+        PLAYER_STORE.add_many(fresh)
+        counts['added'] = len(fresh)
+        version = PLAYER_STORE.version
+
+    logger.info(f"Import complete: {counts['added']} added, {counts['duplicates']} duplicates, {counts['invalid']} invalid, {counts['errors']} fetch errors")
+    yield {"event": "done", "version": version, **counts}
@@ -0,0 +1,158 @@
+# Classement pré-calculé (trié + rangs), reconstruit seulement quand la version du roster change
+import logging
+import threading
+from .player_model import rating_key
+from .player_store import PLAYER_STORE
+
+logger = logging.getLogger(__name__)
+
+MODES = ('rapid', 'blitz')
+MAX_LIMIT = 500
+
+_cache_lock = threading.Lock()
+_cache_version = None
+_cache = {}  # (mode, promo, classe) -> liste de joueurs classés
+
+def _direction(rank, previous_rank):
+    if not previous_rank:
+        return 'neutral'
+    if rank < previous_rank:
+        return 'up'  # rang amélioré (nombre plus petit = meilleur)
+    if rank > previous_rank:
+        return 'down'
+    return 'neutral'
+
+def _build_base(players, mode):
+    """Trie tout le roster pour un mode et calcule rang + direction."""
+    # Direction calculée sur le classement Rapid global (référence de previousRank)
+    rapid_order = sorted(players, key=rating_key('rapid'), reverse=True)
+    rapid_rank = {id(p): idx + 1 for idx, p in enumerate(rapid_order)}
+
+    if mode == 'rapid':
+        ordered = rapid_order
+    else:
+        ordered = sorted(players, key=rating_key(mode), reverse=True)
+
+    ranked = []
+    for idx, player in enumerate(ordered):
+        entry = player.to_dict()
+        entry['rank'] = idx + 1
+        entry['direction'] = _direction(rapid_rank[id(player)], player.previous_rank)
+        ranked.append(entry)
+    return ranked
+
+def _get_ranking(mode, promo, classe):
+    global _cache_version, _cache
+    version, players = PLAYER_STORE.snapshot()
+    key = (mode, promo, classe)
+
+    with _cache_lock:
+        if _cache_version != version:
+            _cache_version = version
+            _cache = {}
+        ranking = _cache.get(key)
+        if ranking is not None:
+            return version, ranking
+
+        base = _cache.get((mode, None, None))
+        if base is None:
+            base = _build_base(players, mode)
+            _cache[(mode, None, None)] = base
+
+        if promo or classe:
+            # Vue filtrée : rangs recalculés dans la vue, direction conservée
+            ranking = []
+            for entry in base:
+                if promo and entry.get('promo') != promo:
+                    continue
+                if classe and (entry.get('class') or '').upper() != classe:
+                    continue
+                ranking.append(dict(entry, rank=len(ranking) + 1))
+            _cache[key] = ranking
+        else:
+            ranking = base
+
+        logger.debug(f"Leaderboard ranking built for {key} (roster v{version})")
+        return version, ranking
+
+def get_leaderboard(mode='rapid', promo=None, classe=None, limit=50, offset=0):
+    """
+    Retourne une page du classement déjà triée et classée.
+
+    Args:
+        mode: 'rapid' ou 'blitz'
+        promo: Filtre sur l'année de promo (optionnel)
+        classe: Filtre sur la lettre de classe (optionnel)
+        limit: Taille de page (plafonnée à MAX_LIMIT)
+        offset: Position de départ
+
+    Returns:
+        dict {version, mode, total, offset, limit, players}
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    limit = max(0, min(int(limit), MAX_LIMIT))
+    offset = max(0, int(offset))
+    classe = classe.upper() if classe else None
+
+    version, ranking = _get_ranking(mode, promo or None, classe)
+    return {
+        "version": version,
+        "mode": mode,
+        "total": len(ranking),
+        "offset": offset,
+        "limit": limit,
+        "players": ranking[offset:offset + limit]
+    }
+
+def get_changes(since):
+    """
+    Retourne les joueurs modifiés depuis la version `since` et les nouveaux rangs.
+
+    Si `since` est plus ancienne que ce que conserve le journal des changements
+    (ou inconnue), retourne le classement Rapid complet (`full: True`).
+
+    Args:
+        since: Version connue du client
+
+    Returns:
+        dict {version, since, full, players, removed, ranks} ou
+        {version, since, full, players} pour un snapshot complet
+    """
+    # Journal lu jusqu'à la version du classement : même version garantie sans lock
+    version, ranking = _get_ranking('rapid', None, None)
+    found = PLAYER_STORE.changes_since(since, until=version)
+
+    if found is None:
+        return {"version": version, "since": since, "full": True, "players": ranking}
+
+    base_entry, entries = found
+    touched = set()
+    removed = set()
+    for entry in entries:
+        for username in entry['added'] | entry['changed']:
+            touched.add(username)
+            removed.discard(username)
+        for username in entry['removed']:
+            removed.add(username)
+            touched.discard(username)
+
+    # Nouveaux rangs : seulement ceux qui ont bougé depuis `since`
+    old_ranks = {username: idx + 1 for idx, username in enumerate(base_entry['order'])}
+    ranks = {}
+    players = []
+    for entry in ranking:
+        username = entry.get('username')
+        if old_ranks.get(username) != entry['rank']:
+            ranks[username] = entry['rank']
+        if username in touched:
+            players.append(entry)
+
+    return {
+        "version": version,
+        "since": since,
+        "full": False,
+        "players": players,
+        "removed": sorted(removed),
+        "ranks": ranks
+    }
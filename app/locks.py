@@ -0,0 +1,52 @@
+# Helpers de verrouillage instrumentés
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from .metrics import LOCK_WAIT_SECONDS, LOCK_HOLD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Cumuls par section critique : {nom: {count, wait_ms, hold_ms, max_wait_ms, max_hold_ms}}
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _record(name, wait_ms, hold_ms):
+    with _stats_lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {"count": 0, "wait_ms": 0.0, "hold_ms": 0.0, "max_wait_ms": 0.0, "max_hold_ms": 0.0}
+        entry["count"] += 1
+        entry["wait_ms"] += wait_ms
+        entry["hold_ms"] += hold_ms
+        entry["max_wait_ms"] = max(entry["max_wait_ms"], wait_ms)
+        entry["max_hold_ms"] = max(entry["max_hold_ms"], hold_ms)
+    LOCK_WAIT_SECONDS.observe(wait_ms / 1000, section=name)
+    LOCK_HOLD_SECONDS.observe(hold_ms / 1000, section=name)
+
+def get_lock_stats():
+    """Copie des cumuls d'attente / détention par nom de section critique."""
+    with _stats_lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+@contextmanager
+def timed_lock(lock, name):
+    """
+    Acquiert `lock` et journalise le temps d'attente et le temps de détention.
+
+    Args:
+        lock: threading.Lock (ou tout objet avec acquire/release)
+        name: Nom de la section critique (pour les logs)
+    """
+    requested_at = time.monotonic()
+    lock.acquire()
+    acquired_at = time.monotonic()
+    try:
+        yield
+    finally:
+        lock.release()
+        released_at = time.monotonic()
+        wait_ms = (acquired_at - requested_at) * 1000
+        hold_ms = (released_at - acquired_at) * 1000
+        _record(name, wait_ms, hold_ms)
+        logger.info(f"Lock {name}: waited {wait_ms:.1f}ms, held {hold_ms:.1f}ms")
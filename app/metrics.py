@@ -0,0 +1,194 @@
+# Métriques en mémoire (compteurs, jauges, histogrammes) exposées au format texte Prometheus
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes par défaut (secondes) : de 5ms à 5 minutes
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Tailles de réponse (octets) : de 1 Ko à 64 Mo
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = []
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels_text(names, values, extra=''):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+class Counter(_Metric):
+    """Compteur monotone, par combinaison de labels."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f'{self.name}{_labels_text(self.labelnames, k)} {_number(v)}' for k, v in items]
+
+class Gauge(_Metric):
+    """
+    Jauge : valeur posée (set / inc / dec), ou lue à chaque scrape via `func`
+    (sans label) pour exposer un état existant sans l'instrumenter.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), func=None):
+        super().__init__(name, help_text, labelnames)
+        self.func = func
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        if self.func is not None:
+            return self._header() + [f'{self.name} {_number(self.func())}']
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f'{self.name}{_labels_text(self.labelnames, k)} {_number(v)}' for k, v in items]
+
+class Histogram(_Metric):
+    """Histogramme à bornes fixes (cumulées au rendu), avec somme et nombre d'observations."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [compteurs par borne (+Inf en dernier), somme, nombre]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe la durée du bloc (secondes), y compris en cas d'exception ou de return."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines = self._header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}')
+            labels = _labels_text(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+def render_metrics():
+    """Toutes les métriques enregistrées, au format d'exposition texte Prometheus."""
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# --- Métriques de l'application ---
+
+CHESS_API_LATENCY = Histogram(
+    'chessapi_chess_request_duration_seconds',
+    'Latency of Chess.com API requests',
+    ('endpoint', 'status')
+)
+
+UPDATE_PHASE_SECONDS = Histogram(
+    'chessapi_update_phase_duration_seconds',
+    'Duration of each phase of a roster update cycle',
+    ('cycle', 'phase')
+)
+
+UPDATE_CYCLES = Counter(
+    'chessapi_update_cycles_total',
+    'Roster update cycles by outcome',
+    ('cycle', 'result')
+)
+
+LOCK_WAIT_SECONDS = Histogram(
+    'chessapi_lock_wait_seconds',
+    'Time spent waiting for a critical section',
+    ('section',)
+)
+
+LOCK_HOLD_SECONDS = Histogram(
+    'chessapi_lock_hold_seconds',
+    'Time a critical section was held',
+    ('section',)
+)
+
+SLACK_JOBS_PENDING = Gauge(
+    'chessapi_slack_jobs_pending',
+    'Slack commands accepted and not yet answered'
+)
+SLACK_JOBS_PENDING.set(0)
+
+DATA_RESPONSE_BYTES = Histogram(
+    'chessapi_data_response_bytes',
+    'Size of /data responses (bytes on the wire, 0 for 304)',
+    ('file', 'encoding'),
+    buckets=SIZE_BUCKETS
+)
@@ -0,0 +1,225 @@
+# Coordination entre processus (plusieurs workers gunicorn) : lock fichier, génération partagée, bail du leader
+import json
+import logging
+import os
+import threading
+
+try:
+    import fcntl  # POSIX uniquement
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+def _require_fcntl():
+    if fcntl is None:
+        raise RuntimeError("MULTIPROCESS_ENABLED requires fcntl (Linux / macOS)")
+
+class InterProcessLock:
+    """
+    Lock ré-entrant valable entre threads et entre processus : un RLock pour les
+    threads du processus, puis un flock exclusif sur `path` pour les autres
+    processus. Même interface que threading.RLock (acquire / release / with),
+    il remplace donc directement le lock du PlayerStore.
+
+    `on_acquire` (optionnel) est appelé à chaque prise du lock fichier, lock
+    tenu : le PlayerStore s'en sert pour recharger le roster si un autre
+    processus l'a modifié, avant toute lecture ou écriture protégée.
+    """
+
+    def __init__(self, path):
+        _require_fcntl()
+        self.path = path
+        self.on_acquire = None
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        if not self._rlock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            try:
+                if self._fd is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._rlock.release()
+                return False
+            except BaseException:
+                self._rlock.release()
+                raise
+        self._depth += 1
+        if self._depth == 1 and self.on_acquire is not None:
+            try:
+                self.on_acquire()
+            except BaseException:
+                self.release()
+                raise
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._rlock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+class SharedGeneration:
+    """
+    Numéro de version du roster partagé par les processus (petit fichier texte).
+
+    Incrémenté à chaque commit, lock inter-processus tenu. Le fichier est
+    remplacé (rename) à chaque écriture : un simple stat suffit aux autres
+    processus pour savoir s'ils doivent recharger, sans relire le roster.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._seen = None  # (inode, mtime) du fichier déjà pris en compte
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def changed(self):
+        """True si le fichier a changé depuis la dernière lecture / écriture de ce processus."""
+        return self._stamp() != self._seen
+
+    def read(self):
+        """Valeur courante (0 si absente), marquée comme vue."""
+        stamp = self._stamp()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                value = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            value = 0
+        self._seen = stamp
+        return value
+
+    def bump(self):
+        """Incrémente la génération (lock inter-processus tenu) et retourne la nouvelle valeur."""
+        value = self.read() + 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(str(value))
+        os.replace(temp_path, self.path)
+        self._seen = self._stamp()
+        return value
+
+class SharedState:
+    """
+    Petit document JSON partagé par les processus (état de l'updater).
+
+    Même principe que SharedGeneration : écrit par un seul processus à la fois
+    (lock inter-processus tenu par l'appelant) et remplacé par rename, les
+    autres processus ne le relisent que si son stat a changé.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._seen = None
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def changed(self):
+        """True si le fichier a changé depuis la dernière lecture / écriture de ce processus."""
+        return self._stamp() != self._seen
+
+    def read(self):
+        """Document courant ({} si absent ou illisible), marqué comme vu."""
+        stamp = self._stamp()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        self._seen = stamp
+        return data
+
+    def write(self, data):
+        """Remplace le document (lock inter-processus tenu par l'appelant)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+        self._seen = self._stamp()
+
+class LeaderLease:
+    """
+    Bail de leader : flock exclusif non bloquant sur `path`, conservé tant que
+    le processus vit et libéré par l'OS à sa mort (pas d'expiration à gérer),
+    ou explicitement par `stop` à l'arrêt. Les autres processus retentent
+    toutes les `retry_seconds` et prennent le relais si le leader disparaît.
+    """
+
+    def __init__(self, path, retry_seconds):
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.held = False
+        self._fd = None
+        self._stop = threading.Event()
+
+    def try_acquire(self):
+        """Tente de prendre le bail sans attendre ; True si ce processus est leader."""
+        _require_fcntl()
+        if self.held:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # PID du leader dans le fichier, pour le diagnostic
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        self.held = True
+        return True
+
+    def run(self, on_elected):
+        """
+        Appelle on_elected() dès que ce processus devient leader : tout de suite si
+        le bail est libre, sinon depuis un thread qui retente périodiquement.
+        """
+        if self.try_acquire():
+            logger.info(f"Process {os.getpid()} is leader ({self.path.name})")
+            on_elected()
+            return
+
+        def wait_for_lease():
+            while not self._stop.wait(self.retry_seconds):
+                if self.try_acquire():
+                    logger.info(f"Process {os.getpid()} took over leadership ({self.path.name})")
+                    on_elected()
+                    return
+
+        logger.info(f"Process {os.getpid()} is follower, retrying leadership every {self.retry_seconds}s")
+        threading.Thread(target=wait_for_lease, name='leader-lease', daemon=True).start()
+
+    def stop(self):
+        """Arrête les tentatives et libère le bail s'il est détenu (arrêt du processus)."""
+        self._stop.set()
+        if self.held:
+            self.held = False
+            os.close(self._fd)  # Libère le flock : un follower peut reprendre le bail
+            self._fd = None
+            logger.info(f"Process {os.getpid()} released leadership ({self.path.name})")
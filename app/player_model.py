@@ -0,0 +1,186 @@
+# Modèle compact d'un joueur (slots, champs numériques à plat) et encodeur/décodeur JSON rapide
+import json
+import sys
+from json.encoder import encode_basestring
+
+# Clés connues du document JSON d'un joueur, dans l'ordre historique de players.json
+KNOWN_KEYS = frozenset((
+    'username', 'firstName', 'lastName', 'promo', 'class', 'previousRank', 'rapid', 'blitz',
+    'history7days', 'lastHistoryUpdate', 'stats', 'avatar'
+))
+
+_EMPTY = {}
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+def _str(value):
+    # encode_basestring est l'implémentation C de json pour les chaînes (équivalent ensure_ascii=False)
+    return encode_basestring(value) if type(value) is str else json.dumps(value, ensure_ascii=False)
+
+def _int(value):
+    return str(value) if type(value) is int else json.dumps(value)
+
+def _indent_extra(value, depth):
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace('\n', '\n' + ' ' * depth)
+
+class Player:
+    """
+    Joueur en mémoire : un objet à slots au lieu de dicts imbriqués
+    (rapid / blitz / stats aplatis en entiers). Les clés inconnues du
+    document JSON sont conservées telles quelles dans `extra`.
+
+    Le format JSON (disque et HTTP) est inchangé : from_dict / to_dict
+    font la conversion, encode_players sérialise directement sans passer
+    par des dicts intermédiaires.
+    """
+
+    __slots__ = (
+        'username', 'first_name', 'last_name', 'promo', 'classe', 'previous_rank',
+        'rapid_current', 'rapid_best', 'blitz_current', 'blitz_best',
+        'wins', 'losses', 'draws', 'history7days', 'last_history_update', 'avatar', 'extra'
+    )
+
+    def __init__(self, username, first_name='', last_name='', promo='', classe='', previous_rank=0,
+                 rapid_current=0, rapid_best=0, blitz_current=0, blitz_best=0,
+                 wins=0, losses=0, draws=0, history7days=(), last_history_update='', avatar='', extra=None):
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+        self.promo = promo
+        self.classe = classe
+        self.previous_rank = previous_rank
+        self.rapid_current = rapid_current
+        self.rapid_best = rapid_best
+        self.blitz_current = blitz_current
+        self.blitz_best = blitz_best
+        self.wins = wins
+        self.losses = losses
+        self.draws = draws
+        self.history7days = tuple(history7days)
+        self.last_history_update = last_history_update
+        self.avatar = avatar
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Construit un Player depuis le document JSON d'un joueur."""
+        if isinstance(data, Player):
+            return data
+        get = data.get
+        rapid = get('rapid') or _EMPTY
+        blitz = get('blitz') or _EMPTY
+        stats = get('stats') or _EMPTY
+        player = cls.__new__(cls)
+        player.username = get('username')
+        player.first_name = get('firstName', '')
+        player.last_name = get('lastName', '')
+        # Valeurs très répétées : internées pour partager une seule chaîne par valeur
+        player.promo = _intern(get('promo', ''))
+        player.classe = _intern(get('class', ''))
+        player.previous_rank = get('previousRank', 0)
+        player.rapid_current = rapid.get('current', 0)
+        player.rapid_best = rapid.get('best', 0)
+        player.blitz_current = blitz.get('current', 0)
+        player.blitz_best = blitz.get('best', 0)
+        player.wins = stats.get('wins', 0)
+        player.losses = stats.get('losses', 0)
+        player.draws = stats.get('draws', 0)
+        player.history7days = tuple(get('history7days') or ())
+        player.last_history_update = _intern(get('lastHistoryUpdate', ''))
+        player.avatar = get('avatar', '')
+        player.extra = None if data.keys() <= KNOWN_KEYS else {
+            k: v for k, v in data.items() if k not in KNOWN_KEYS
+        }
+        return player
+
+    def to_dict(self):
+        """Document JSON du joueur (nouveaux dicts/listes : modifiable par l'appelant)."""
+        data = {
+            "username": self.username,
+            "firstName": self.first_name,
+            "lastName": self.last_name,
+            "promo": self.promo,
+            "class": self.classe,
+            "previousRank": self.previous_rank,
+            "rapid": {"current": self.rapid_current, "best": self.rapid_best},
+            "blitz": {"current": self.blitz_current, "best": self.blitz_best},
+            "history7days": list(self.history7days),
+            "lastHistoryUpdate": self.last_history_update,
+            "stats": {"wins": self.wins, "losses": self.losses, "draws": self.draws},
+            "avatar": self.avatar
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, Player):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Player({self.username!r}, rapid={self.rapid_current}, blitz={self.blitz_current})"
+
+def rating_key(mode):
+    """Clé de tri par score courant ('rapid' / 'blitz'), pour Player comme pour dict."""
+    attr = f'{mode}_current'
+
+    def key(player):
+        if isinstance(player, Player):
+            return getattr(player, attr)
+        return player.get(mode, {}).get('current', 0)
+    return key
+
+def encode_player(p, pretty=False):
+    """Sérialise un Player en JSON, sans dict intermédiaire (même sortie que json.dumps(p.to_dict()))."""
+    history = p.history7days
+    if pretty:
+        history_json = '[\n      ' + ',\n      '.join(map(_int, history)) + '\n    ]' if history else '[]'
+        extra = ''.join(
+            f',\n    {_str(k)}: {_indent_extra(v, 4)}' for k, v in p.extra.items()
+        ) if p.extra else ''
+        return (
+            f'{{\n    "username": {_str(p.username)},\n    "firstName": {_str(p.first_name)},'
+            f'\n    "lastName": {_str(p.last_name)},\n    "promo": {_str(p.promo)},'
+            f'\n    "class": {_str(p.classe)},\n    "previousRank": {_int(p.previous_rank)},'
+            f'\n    "rapid": {{\n      "current": {_int(p.rapid_current)},\n      "best": {_int(p.rapid_best)}\n    }},'
+            f'\n    "blitz": {{\n      "current": {_int(p.blitz_current)},\n      "best": {_int(p.blitz_best)}\n    }},'
+            f'\n    "history7days": {history_json},'
+            f'\n    "lastHistoryUpdate": {_str(p.last_history_update)},'
+            f'\n    "stats": {{\n      "wins": {_int(p.wins)},\n      "losses": {_int(p.losses)},'
+            f'\n      "draws": {_int(p.draws)}\n    }},'
+            f'\n    "avatar": {_str(p.avatar)}{extra}\n  }}'
+        )
+    extra = ''.join(
+        f',{_str(k)}:{json.dumps(v, ensure_ascii=False, separators=(",", ":"))}' for k, v in p.extra.items()
+    ) if p.extra else ''
+    return (
+        f'{{"username":{_str(p.username)},"firstName":{_str(p.first_name)},"lastName":{_str(p.last_name)},'
+        f'"promo":{_str(p.promo)},"class":{_str(p.classe)},"previousRank":{_int(p.previous_rank)},'
+        f'"rapid":{{"current":{_int(p.rapid_current)},"best":{_int(p.rapid_best)}}},'
+        f'"blitz":{{"current":{_int(p.blitz_current)},"best":{_int(p.blitz_best)}}},'
+        f'"history7days":[{",".join(map(_int, history))}],"lastHistoryUpdate":{_str(p.last_history_update)},'
+        f'"stats":{{"wins":{_int(p.wins)},"losses":{_int(p.losses)},"draws":{_int(p.draws)}}},'
+        f'"avatar":{_str(p.avatar)}{extra}}}'
+    )
+
+def encode_players(players, pretty=False):
+    """
+    Sérialise une liste de joueurs.
+
+    Args:
+        players: itérable de Player
+        pretty: True pour le format indenté de players.json (indent=2), sinon JSON compact (HTTP)
+    """
+    if pretty:
+        items = [encode_player(p, pretty=True) for p in players]
+        return '[\n  ' + ',\n  '.join(items) + '\n]' if items else '[]'
+    return '[' + ','.join([encode_player(p) for p in players]) + ']'
+
+def decode_players(text):
+    """Décode un document JSON (liste de joueurs) en liste de Player (entrées non-objets ignorées)."""
+    return [Player.from_dict(p) for p in json.loads(text) if isinstance(p, dict)]
@@ -0,0 +1,324 @@
+# Roster en mémoire, chargé une seule fois par processus, avec index
+import logging
+import threading
+from collections import deque
+from .config import (
+    PLAYERS_JSON_LOCK, CHANGELOG_SIZE, MULTIPROCESS_ENABLED, ROSTER_LOCK_PATH, ROSTER_GENERATION_PATH
+)
+from .multiprocess import InterProcessLock, SharedGeneration
+from .metrics import Gauge
+from .player_model import Player, rating_key
+from .storage import create_storage
+
+logger = logging.getLogger(__name__)
+
+def name_key(first_name, last_name):
+    """Clé d'index (prénom, nom) en minuscules, partagée avec l'import en masse."""
+    return ((first_name or '').lower(), (last_name or '').lower())
+
+def username_key(username):
+    """Clé d'index d'un username : les pseudos Chess.com sont insensibles à la casse."""
+    return (username or '').lower()
+
+def rapid_order(players):
+    """Usernames triés par score Rapid décroissant (ordre du classement)."""
+    ordered = sorted(players, key=rating_key('rapid'), reverse=True)
+    return tuple(p.username for p in ordered)
+
+class PlayerStore:
+    """
+    Source de vérité du roster pour le processus.
+
+    Les joueurs sont conservés en mémoire sous forme de Player (slots) ; les
+    lectures renvoient des dicts neufs (modifiables) et les écritures acceptent
+    des dicts, convertis à l'entrée. Le backend de stockage n'est lu qu'au premier accès ; ensuite toutes les
+    lectures se font en mémoire via des index (username exact, username et
+    (prénom, nom) en minuscules). Toutes les écritures passent par le store : elles sont
+    persistées par le backend (avec la liste des joueurs modifiés/supprimés,
+    pour les backends incrémentaux) puis incrémentent `version`.
+
+    Chaque version commitée est résumée dans un journal des changements borné
+    (usernames ajoutés / modifiés / supprimés + ordre du classement) pour servir
+    des deltas aux clients.
+
+    Le lock (ré-entrant) peut être tenu par l'appelant pour enchaîner
+    vérification + écriture dans une même section critique. Les lectures ne le
+    prennent pas : chaque commit publie un nouvel état immuable (tuple de
+    joueurs, index, version) sous un lock local très court, que les lectures
+    prennent seul.
+
+    En multi-processus, `lock` est un InterProcessLock et `generation` le
+    numéro de version partagé : chaque prise du lock recharge le roster si un
+    autre processus a commité entre-temps, et `version` suit la génération
+    partagée (mêmes versions, deltas et ETags dans tous les workers). Seules
+    les écritures et les rechargements prennent le flock ; une lecture fait
+    un stat de la génération puis lit l'état publié du processus.
+    """
+
+    def __init__(self, storage, lock, changelog_size=CHANGELOG_SIZE, generation=None):
+        self.storage = storage
+        self.lock = lock
+        self.generation = generation
+        self.version = 0
+        self.changelog = deque(maxlen=changelog_size)
+        self._players = None
+        self._by_username = {}
+        self._by_username_key = {}
+        self._by_name = {}
+        self._listeners = []
+        # Publication / lecture de l'état courant (local au processus, jamais tenu pendant une E/S)
+        self._state_lock = threading.Lock()
+        if generation is not None:
+            lock.on_acquire = self._sync
+
+    def add_listener(self, callback):
+        """Enregistre callback(version), appelé après chaque commit (doit être non bloquant)."""
+        self._listeners.append(callback)
+
+    # --- Chargement / index ---
+
+    def _ensure_loaded(self):
+        if self._players is not None:
+            if self.generation is not None and self.generation.changed():
+                with self.lock:
+                    pass  # La prise du lock recharge le roster (_sync)
+            return
+        with self.lock:
+            if self._players is not None:
+                return
+            players = self.storage.load()
+            version = self.generation.read() if self.generation is not None else self.version
+            self._publish(players, version, (), (), ())
+            logger.info(f"PlayerStore loaded {len(players)} players ({self.storage.name} backend)")
+
+    def _sync(self):
+        """Recharge le roster si un autre processus l'a modifié (appelé lock inter-processus tenu)."""
+        if self._players is None or not self.generation.changed():
+            return
+        version = self.generation.read()
+        if version == self.version:
+            return
+        players = getattr(self.storage, 'reload', self.storage.load)()
+
+        # Entrée du journal des changements reconstruite par diff (deltas clients)
+        old_by_username = self._by_username
+        new_usernames = {p.username for p in players}
+        added = [p.username for p in players if p.username not in old_by_username]
+        changed = [p.username for p in players
+                   if p.username in old_by_username and old_by_username[p.username] != p]
+        removed = [u for u in old_by_username if u not in new_usernames]
+
+        self._publish(players, version, added, changed, removed)
+        logger.info(f"Roster v{version} reloaded from another process "
+                    f"({len(added)} added, {len(changed)} changed, {len(removed)} removed)")
+        self._notify()
+
+    def sync(self):
+        """Prend en compte les commits des autres processus (sans effet en mono-processus)."""
+        self._ensure_loaded()
+
+    def _publish(self, players, version, added, changed, removed):
+        """Remplace l'état lu par les lectures (appelé sous `lock`) ; index construits hors du lock local."""
+        players = tuple(players)
+        by_username = {}
+        by_username_key = {}
+        by_name = {}
+        for player in players:
+            username = player.username
+            if username:
+                by_username[username] = player
+                by_username_key[username_key(username)] = player
+            key = name_key(player.first_name, player.last_name)
+            if key != ('', ''):
+                by_name.setdefault(key, []).append(player)
+        entry = self._change_entry(version, added, changed, removed, players)
+        with self._state_lock:
+            self._players = players
+            self._by_username = by_username
+            self._by_username_key = by_username_key
+            self._by_name = by_name
+            self.version = version
+            self.changelog.append(entry)
+
+    @staticmethod
+    def _change_entry(version, added, changed, removed, players):
+        return {
+            "version": version,
+            "added": frozenset(added),
+            "changed": frozenset(changed),
+            "removed": frozenset(removed),
+            "order": rapid_order(players)
+        }
+
+    def changes_since(self, since, until=None):
+        """
+        Retourne les entrées du journal des changements postérieures à `since`
+        (et jusqu'à `until` inclus si fourni, pour rester cohérent avec un snapshot).
+
+        Returns:
+            tuple (entrée de la version `since`, [entrées suivantes]) ou None si
+            `since` n'est plus (ou pas) dans le journal
+        """
+        self._ensure_loaded()
+        with self._state_lock:
+            entries = list(self.changelog)
+        if until is not None:
+            entries = [e for e in entries if e['version'] <= until]
+        for idx, entry in enumerate(entries):
+            if entry['version'] == since:
+                return entry, entries[idx + 1:]
+        return None
+
+    # --- Lectures (O(1)) ---
+
+    def get(self, username):
+        """Retourne une copie (dict) du joueur ou None."""
+        self._ensure_loaded()
+        player = self._by_username.get(username)
+        return player.to_dict() if player else None
+
+    def exists(self, username):
+        """True si un joueur porte ce username (insensible à la casse, comme Chess.com)."""
+        self._ensure_loaded()
+        return username_key(username) in self._by_username_key
+
+    def find_by_name(self, first_name, last_name):
+        """Retourne les copies des joueurs portant ce prénom + nom (insensible à la casse)."""
+        self._ensure_loaded()
+        return [p.to_dict() for p in self._by_name.get(name_key(first_name, last_name), [])]
+
+    def usernames(self):
+        return [p.username for p in self.snapshot()[1] if p.username]
+
+    def get_players(self):
+        """Retourne une copie modifiable du roster (dicts, ordre conservé)."""
+        return [p.to_dict() for p in self.snapshot()[1]]
+
+    def snapshot(self):
+        """
+        Retourne (version, joueurs) cohérents entre eux, en lecture seule (tuple de Player).
+        Les objets d'une version commitée ne sont plus jamais modifiés par le store.
+        """
+        self._ensure_loaded()
+        with self._state_lock:
+            return self.version, self._players
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._players)
+
+    # --- Écritures ---
+
+    def _commit(self, players, changed, removed):
+        """Persiste via le backend puis remplace l'état mémoire (appelé sous lock)."""
+        self.storage.write(players, changed, removed)
+
+        changed_usernames = [p.username for p in changed]
+        added = [u for u in changed_usernames if u not in self._by_username]
+        updated = [u for u in changed_usernames if u in self._by_username]
+
+        version = self.generation.bump() if self.generation is not None else self.version + 1
+        self._publish(players, version, added, updated, removed)
+        self._notify()
+
+    def _notify(self):
+        for callback in self._listeners:
+            try:
+                callback(self.version)
+            except Exception as e:
+                logger.error(f"PlayerStore listener failed: {e}")
+
+    def compact(self):
+        """Compaction du journal / export players.json différé (SQLite) ; sans effet pour le backend json."""
+        compact = getattr(self.storage, 'compact', None)
+        if compact is None:
+            return
+        self._ensure_loaded()
+        with self.lock:
+            if self.storage.compact_needed():
+                compact(self._players)
+
+    def replace_all(self, players):
+        """Remplace tout le roster (updater, POST /api/players)."""
+        self._ensure_loaded()
+        with self.lock:
+            players = [Player.from_dict(p) for p in players if isinstance(p, (dict, Player))]
+
+            # Diff par username : seuls les joueurs réellement modifiés sont réécrits par les backends incrémentaux
+            old_by_username = self._by_username
+            new_usernames = set()
+            changed = []
+            for player in players:
+                username = player.username
+                new_usernames.add(username)
+                if old_by_username.get(username) != player:
+                    changed.append(player)
+            removed = [u for u in old_by_username if u not in new_usernames]
+
+            if not changed and not removed and len(players) == len(self._players) and all(
+                    p.username == q.username for p, q in zip(players, self._players)):
+                return  # Rien n'a changé : pas de nouvelle version
+
+            self._commit(players, changed, removed)
+
+    def upsert_players(self, players, removed_usernames=()):
+        """
+        Remplace les joueurs donnés (par username, position conservée) et supprime
+        `removed_usernames`, sans cloner ni comparer le reste du roster.
+        Les usernames absents du roster sont ajoutés en fin de liste.
+        """
+        self._ensure_loaded()
+        with self.lock:
+            replacements = {p.username: p for p in map(Player.from_dict, players) if p.username}
+            removed = set(removed_usernames) - set(replacements)
+            removed &= set(self._by_username)
+            if not replacements and not removed:
+                return
+
+            new_players = []
+            for player in self._players:
+                username = player.username
+                if username in removed:
+                    continue
+                new_players.append(replacements.get(username, player))
+            new_players.extend(p for u, p in replacements.items() if u not in self._by_username)
+
+            self._commit(new_players, list(replacements.values()), sorted(removed))
+
+    def add_many(self, players):
+        """Ajoute plusieurs joueurs en un seul commit (doublons vérifiés par l'appelant, sous lock)."""
+        self._ensure_loaded()
+        with self.lock:
+            players = [Player.from_dict(p) for p in players]
+            if players:
+                self._commit(list(self._players) + players, players, [])
+
+    def remove_by_name(self, first_name, last_name):
+        """
+        Supprime tous les joueurs portant ce prénom + nom.
+
+        Returns:
+            Liste des joueurs supprimés
+        """
+        self._ensure_loaded()
+        with self.lock:
+            removed = self._by_name.get(name_key(first_name, last_name), [])
+            if removed:
+                removed_ids = {id(p) for p in removed}
+                self._commit(
+                    [p for p in self._players if id(p) not in removed_ids],
+                    [],
+                    [p.username for p in removed if p.username]
+                )
+            return [p.to_dict() for p in removed]
+
+# Instance globale partagée par l'updater et le serveur
+if MULTIPROCESS_ENABLED:
+    PLAYER_STORE = PlayerStore(
+        create_storage(), InterProcessLock(ROSTER_LOCK_PATH), generation=SharedGeneration(ROSTER_GENERATION_PATH)
+    )
+else:
+    PLAYER_STORE = PlayerStore(create_storage(), PLAYERS_JSON_LOCK)
+
+Gauge('chessapi_roster_players', 'Players in the roster', func=lambda: len(PLAYER_STORE))
+Gauge('chessapi_roster_version', 'Current roster version', func=lambda: PLAYER_STORE.version)
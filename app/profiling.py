@@ -0,0 +1,152 @@
+# Profilage à la demande (cProfile / tracemalloc) des cycles de mise à jour et des routes Flask
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from .config import PROFILING_MODE, PROFILING_SAMPLE_RATE, PROFILING_DIR, PROFILING_KEEP, PROFILING_ROUTES
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cpu', 'memory', 'both')
+PROFILING_ENABLED = PROFILING_MODE in MODES
+_CPU = PROFILING_MODE in ('cpu', 'both')
+_MEMORY = PROFILING_MODE in ('memory', 'both')
+
+if PROFILING_MODE and not PROFILING_ENABLED:
+    logger.warning(f"Unknown PROFILING_MODE '{PROFILING_MODE}', profiling disabled (use one of {', '.join(MODES)})")
+
+# cProfile et tracemalloc sont globaux au processus : une seule exécution profilée à la fois
+_busy = threading.Lock()
+_counters = {}
+_counters_lock = threading.Lock()
+
+# Allocations internes exclues du résumé mémoire
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+def _should_sample(name):
+    """1 exécution sur PROFILING_SAMPLE_RATE par nom (la première est toujours profilée)."""
+    with _counters_lock:
+        n = _counters.get(name, 0)
+        _counters[name] = n + 1
+    return n % max(1, PROFILING_SAMPLE_RATE) == 0
+
+def profiled(name):
+    """
+    Décorateur : profile 1 appel sur PROFILING_SAMPLE_RATE et écrit le résultat
+    dans PROFILING_DIR. Si le profilage est désactivé, la fonction est retournée
+    telle quelle (aucun surcoût). Un appel qui arrive pendant qu'un autre est
+    profilé s'exécute normalement.
+    """
+    def decorator(func):
+        if not PROFILING_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _should_sample(name) or not _busy.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return _run_profiled(name, func, args, kwargs)
+            finally:
+                _busy.release()
+        return wrapper
+    return decorator
+
+def _run_profiled(name, func, args, kwargs):
+    profiler = cProfile.Profile() if _CPU else None
+    # Si tracemalloc tourne déjà (PYTHONTRACEMALLOC), on se contente d'un snapshot
+    owns_tracemalloc = _MEMORY and not tracemalloc.is_tracing()
+    if owns_tracemalloc:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        snapshot = peak = None
+        if _MEMORY:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            peak = tracemalloc.get_traced_memory()[1]
+            if owns_tracemalloc:
+                tracemalloc.stop()
+        try:
+            _write_profile(name, elapsed, profiler, snapshot, peak)
+        except Exception as e:
+            logger.error(f"Failed to write profile for {name}: {e}")
+
+def _write_profile(name, elapsed, profiler, snapshot, peak):
+    """Écrit <horodatage>-<nom>.txt (résumé lisible) et .prof (pstats, si cProfile)."""
+    PROFILING_DIR.mkdir(parents=True, exist_ok=True)
+    now = datetime.now()
+    base = PROFILING_DIR / f"{now.strftime('%Y%m%dT%H%M%S.%f')}-{name}"
+
+    out = io.StringIO()
+    out.write(f"{name} | {now.isoformat(timespec='seconds')} | {elapsed * 1000:.1f} ms | mode {PROFILING_MODE}\n")
+    if profiler:
+        profiler.dump_stats(f"{base}.prof")
+        out.write("\n== CPU (cProfile, cumulative time, top 40) ==\n")
+        pstats.Stats(profiler, stream=out).strip_dirs().sort_stats('cumulative').print_stats(40)
+    if snapshot:
+        # tracemalloc voit toutes les threads : les allocations concurrentes apparaissent aussi
+        out.write(f"\n== Memory (tracemalloc): peak {peak / 1024:.1f} KiB, top 25 live allocations ==\n")
+        for stat in snapshot.statistics('lineno')[:25]:
+            out.write(f"{stat}\n")
+
+    with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+        f.write(out.getvalue())
+    _prune()
+    logger.info(f"Profile written: {base}.txt ({elapsed:.2f}s)")
+
+def _prune():
+    """Ne conserve que les PROFILING_KEEP profils les plus récents."""
+    summaries = sorted(PROFILING_DIR.glob('*.txt'))
+    for old in summaries[:-PROFILING_KEEP] if PROFILING_KEEP > 0 else []:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.prof').unlink(missing_ok=True)
+
+def list_profiles():
+    """Noms des profils disponibles, du plus récent au plus ancien."""
+    if not PROFILING_DIR.exists():
+        return []
+    return [p.stem for p in sorted(PROFILING_DIR.glob('*.txt'), reverse=True)]
+
+def latest_profile(name=None, kind='txt'):
+    """
+    Chemin du dernier profil (ou None).
+
+    Args:
+        name: Ne considérer que les profils de cette fonction / route (ex: 'update_all_players')
+        kind: 'txt' (résumé) ou 'prof' (dump pstats, seulement en mode cpu / both)
+    """
+    for stem in list_profiles():
+        if name and not stem.endswith(f"-{name}"):
+            continue
+        path = PROFILING_DIR / f"{stem}.{kind}"
+        return path if path.exists() else None
+    return None
+
+def install_route_profiling(app):
+    """Enveloppe les fonctions de vue listées dans PROFILING_ROUTES (rien si désactivé)."""
+    if not PROFILING_ENABLED:
+        return
+    for endpoint in PROFILING_ROUTES:
+        view = app.view_functions.get(endpoint)
+        if view is None:
+            logger.warning(f"PROFILING_ROUTES: unknown endpoint '{endpoint}'")
+            continue
+        app.view_functions[endpoint] = profiled(f"route-{endpoint}")(view)
+    logger.info(f"Profiling enabled ({PROFILING_MODE}, 1/{PROFILING_SAMPLE_RATE}) -> {PROFILING_DIR}")
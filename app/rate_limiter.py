@@ -0,0 +1,53 @@
+# Rate limiter token bucket partagé entre threads
+import threading
+import time
+
+class TokenBucket:
+    """
+    Token bucket thread-safe : `rate` jetons par seconde, jusqu'à `burst` jetons accumulés.
+
+    Chaque appel à acquire() réserve un jeton ; si le seau est vide, le thread
+    appelant dort jusqu'à ce que son jeton soit disponible. Les réservations
+    sont servies dans l'ordre d'arrivée, le débit global ne dépasse donc jamais
+    `rate` quelle que soit la taille du pool de threads.
+    """
+
+    def __init__(self, rate, burst):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens=1):
+        """
+        Réserve `tokens` jetons, en bloquant si nécessaire.
+
+        Returns:
+            float: temps d'attente effectif en secondes
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        # Dormir hors du lock pour ne pas bloquer les autres réservations
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """
+        Suspend la distribution de jetons pendant `seconds` secondes (ex: Retry-After) :
+        les réservations suivantes, tous threads confondus, sont servies après la pause.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
@@ -0,0 +1,195 @@
+# Schedulers de rafraîchissement partiel : file de priorité adaptative et rafraîchissement glissant
+import bisect
+import heapq
+import logging
+import math
+import threading
+import time
+from .chess_api import CHESS_API_BREAKER
+from .chess_updater import refresh_players, should_run_update, pending_retries
+from .config import (
+    PRIORITY_TICK_SECONDS, PRIORITY_MIN_INTERVAL_MINUTES, PRIORITY_MAX_INTERVAL_MINUTES,
+    CHESS_API_RATE_LIMIT, ROLLING_TICK_SECONDS, UPDATE_INTERVAL_MINUTES
+)
+from .player_store import PLAYER_STORE
+
+logger = logging.getLogger(__name__)
+
+# Paliers d'activité : (ancienneté max de la dernière partie, intervalle de rafraîchissement), en secondes
+ACTIVITY_TIERS = [
+    (3600, 5 * 60),            # A joué dans l'heure : toutes les 5 minutes
+    (6 * 3600, 15 * 60),       # Dans les 6 heures : toutes les 15 minutes
+    (24 * 3600, 30 * 60),      # Dans la journée : toutes les 30 minutes
+    (7 * 24 * 3600, 3600),     # Dans la semaine : toutes les heures
+    (30 * 24 * 3600, 6 * 3600) # Dans le mois : toutes les 6 heures
+]
+
+class PriorityRefreshQueue:
+    """
+    File de priorité (tas) des joueurs à rafraîchir, ordonnée par échéance.
+
+    L'intervalle de chaque joueur s'adapte à son activité observée :
+    - score modifié au dernier passage -> intervalle minimal
+    - sinon, palier selon la date de la dernière partie (`last.date` Chess.com)
+    - sinon (304, pas d'info), l'intervalle précédent est doublé
+    Les intervalles sont bornés par [min_interval, max_interval].
+    """
+
+    def __init__(self, min_interval, max_interval):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._heap = []  # (échéance, username)
+        self._due = {}  # username -> échéance courante (entrées obsolètes du tas ignorées)
+        self._interval = {}  # username -> dernier intervalle
+        self._last_played = {}  # username -> timestamp de la dernière partie connue
+        self._lock = threading.Lock()
+
+    def _schedule(self, username, due):
+        self._due[username] = due
+        heapq.heappush(self._heap, (due, username))
+
+    def sync(self, usernames, now):
+        """Ajoute les nouveaux joueurs (échéance immédiate) et oublie ceux supprimés."""
+        with self._lock:
+            current = set(usernames)
+            for username in usernames:
+                if username not in self._due:
+                    self._interval[username] = self.min_interval
+                    self._schedule(username, now)
+            for username in [u for u in self._due if u not in current]:
+                del self._due[username]
+                self._interval.pop(username, None)
+                self._last_played.pop(username, None)
+
+    def pop_due(self, now, limit):
+        """Retire jusqu'à `limit` joueurs dont l'échéance est passée (les plus en retard d'abord)."""
+        due = []
+        with self._lock:
+            while self._heap and len(due) < limit and self._heap[0][0] <= now:
+                when, username = heapq.heappop(self._heap)
+                if self._due.get(username) != when:
+                    continue  # Entrée obsolète (replanifié ou supprimé)
+                del self._due[username]
+                due.append(username)
+        return due
+
+    def next_interval(self, username, result, now):
+        if result['ratingChanged']:
+            return self.min_interval
+
+        last_played = result.get('lastPlayed') or self._last_played.get(username)
+        if last_played:
+            age = max(0, now - last_played)
+            interval = self.max_interval
+            for max_age, tier_interval in ACTIVITY_TIERS:
+                if age <= max_age:
+                    interval = tier_interval
+                    break
+        else:
+            interval = self._interval.get(username, self.min_interval) * 2
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def reschedule(self, username, result, now):
+        with self._lock:
+            if result.get('lastPlayed'):
+                self._last_played[username] = result['lastPlayed']
+            if result['status'] in ('error', 'deferred'):
+                # Échéance nulle : en tête du tas au prochain tick, intervalle inchangé
+                self._schedule(username, 0.0)
+                return
+            interval = self.next_interval(username, result, now)
+            self._interval[username] = interval
+            self._schedule(username, now + interval)
+
+    def requeue(self, usernames, now):
+        """Remet des joueurs non traités (ex: supprimés du roster puis ré-ajoutés) à échéance immédiate."""
+        with self._lock:
+            for username in usernames:
+                self._schedule(username, now)
+
+    def stats(self):
+        with self._lock:
+            intervals = list(self._interval.values())
+            next_due = min(self._due.values()) if self._due else None
+        return {
+            "players": len(intervals),
+            "minIntervalMinutes": round(min(intervals) / 60, 1) if intervals else None,
+            "maxIntervalMinutes": round(max(intervals) / 60, 1) if intervals else None,
+            "nextDueInSeconds": round(max(0.0, next_due - time.time()), 1) if next_due is not None else None
+        }
+
+REFRESH_QUEUE = PriorityRefreshQueue(PRIORITY_MIN_INTERVAL_MINUTES * 60, PRIORITY_MAX_INTERVAL_MINUTES * 60)
+
+def run_priority_tick():
+    """
+    Job du scheduler adaptatif : rafraîchit les joueurs arrivés à échéance.
+    Le nombre de joueurs par tick est plafonné par le débit autorisé (2 requêtes max par joueur).
+    """
+    if not should_run_update() or CHESS_API_BREAKER.state == 'open':
+        return
+    now = time.time()
+    REFRESH_QUEUE.sync(PLAYER_STORE.usernames(), now)
+
+    limit = max(1, int(CHESS_API_RATE_LIMIT * PRIORITY_TICK_SECONDS / 2))
+    due = REFRESH_QUEUE.pop_due(now, limit)
+    if not due:
+        return
+
+    logger.info(f"Priority refresh: {len(due)} players due")
+    results = refresh_players(due, label="priority_refresh")
+    now = time.time()
+    for username, result in results.items():
+        REFRESH_QUEUE.reschedule(username, result, now)
+    logger.info(f"Priority refresh done: {REFRESH_QUEUE.stats()}")
+
+class RollingRefresh:
+    """
+    Rafraîchissement glissant : le roster (trié par username) est parcouru par
+    tranches à chaque tick, de sorte que chaque joueur soit rafraîchi une fois
+    par `interval_seconds`, avec un débit constant au lieu d'une rafale.
+
+    Le curseur est le dernier username traité : les ajouts/suppressions entre
+    deux ticks ne font ni sauter ni doubler de joueur dans le tour en cours.
+    """
+
+    def __init__(self, interval_seconds, tick_seconds):
+        self.interval_seconds = interval_seconds
+        self.tick_seconds = tick_seconds
+        self._cursor = None
+        self._lock = threading.Lock()
+
+    def slice_size(self, roster_size):
+        ticks_per_round = max(1, self.interval_seconds / self.tick_seconds)
+        return max(1, math.ceil(roster_size / ticks_per_round))
+
+    def next_slice(self, usernames):
+        """Retourne la prochaine tranche de usernames (reprise au début en fin de tour)."""
+        ordered = sorted(set(usernames))
+        if not ordered:
+            return []
+        size = min(self.slice_size(len(ordered)), len(ordered))
+        with self._lock:
+            start = bisect.bisect_right(ordered, self._cursor) if self._cursor is not None else 0
+            chunk = ordered[start:start + size]
+            if len(chunk) < size:
+                # Fin du tour : compléter avec le début du roster
+                chunk += ordered[:size - len(chunk)]
+            self._cursor = chunk[-1]
+        return chunk
+
+ROLLING_REFRESH = RollingRefresh(UPDATE_INTERVAL_MINUTES * 60, ROLLING_TICK_SECONDS)
+
+def run_rolling_tick():
+    """Job du mode glissant : rafraîchit la tranche suivante du roster."""
+    if not should_run_update() or CHESS_API_BREAKER.state == 'open':
+        return
+    usernames = PLAYER_STORE.usernames()
+    chunk = ROLLING_REFRESH.next_slice(usernames)
+    if not chunk:
+        return
+    # Les joueurs en échec au tick précédent passent en tête, en plus de la tranche
+    roster = set(usernames)
+    retry = [u for u in pending_retries() if u in roster and u not in chunk]
+    chunk = retry[:len(chunk)] + chunk
+    logger.info(f"Rolling refresh: {len(chunk)} players ({chunk[0]} .. {chunk[-1]})")
+    refresh_players(chunk, label="rolling_refresh")
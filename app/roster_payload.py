@@ -0,0 +1,66 @@
+# Réponses pré-sérialisées et pré-compressées du roster, une par version
+import gzip
+import hashlib
+import logging
+import threading
+from .player_model import encode_players
+from .player_store import PLAYER_STORE
+
+try:
+    import brotli  # Dans requirements.txt ; sans lui, gzip seul
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+class RosterPayload:
+    """
+    Octets JSON d'une version du roster, avec leurs variantes compressées.
+    Chaque variante a son propre ETag fort (suffixe de l'encodage, RFC 7232).
+    """
+
+    def __init__(self, version, players):
+        self.version = version
+        self.raw = encode_players(players).encode('utf-8')
+        digest = hashlib.sha1(self.raw).hexdigest()[:16]
+        self.etag = f"v{version}-{digest}"
+        self.encoded = {'gzip': gzip.compress(self.raw, compresslevel=9)}
+        if brotli is not None:
+            self.encoded['br'] = brotli.compress(self.raw, quality=11)
+
+    def body_for(self, accept_encodings):
+        """
+        Choisit la meilleure variante acceptée par le client.
+
+        Args:
+            accept_encodings: werkzeug MIMEAccept/Accept de l'en-tête Accept-Encoding
+
+        Returns:
+            tuple (octets, content-encoding ou None)
+        """
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encoded and accept_encodings[encoding]:
+                return self.encoded[encoding], encoding
+        return self.raw, None
+
+    def etag_for(self, encoding):
+        """ETag de la variante servie (`encoding` None pour la variante non compressée)."""
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+_lock = threading.Lock()
+_payload = None
+
+def get_roster_payload():
+    """Retourne le payload de la version courante (reconstruit seulement si la version a changé)."""
+    global _payload
+    version, players = PLAYER_STORE.snapshot()
+    payload = _payload
+    if payload is not None and payload.version == version:
+        return payload
+
+    with _lock:
+        if _payload is None or _payload.version != version:
+            _payload = RosterPayload(version, players)
+            sizes = ', '.join(f"{k}={len(v)}" for k, v in _payload.encoded.items())
+            logger.info(f"Roster payload v{version} built: raw={len(_payload.raw)} {sizes}")
+        return _payload
@@ -2,8 +2,15 @@
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from .chess_updater import update_all_players
-from .config import UPDATE_INTERVAL_MINUTES, SCHEDULER_ENABLED
+from .chess_updater import update_all_players, refresh_ranks
+from .player_store import PLAYER_STORE
+from .refresh_queue import run_priority_tick, run_rolling_tick
+from .timeseries import TIMESERIES
+from .config import (
+    UPDATE_INTERVAL_MINUTES, SCHEDULER_ENABLED, SCHEDULER_MODE, STORAGE_BACKEND, JOURNAL_COMPACT_MINUTES,
+    PRIORITY_TICK_SECONDS, ROLLING_TICK_SECONDS, TIMESERIES_ENABLED, MULTIPROCESS_ENABLED, ROSTER_SYNC_SECONDS,
+    SQLITE_EXPORT_SECONDS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +20,11 @@ scheduler = None
 def start_scheduler():
     """
     Démarre le scheduler APScheduler.
-    Exécute update_all_players toutes les N minutes.
+    - mode 'full' : exécute update_all_players toutes les N minutes
+    - mode 'priority' : tick fréquent qui ne rafraîchit que les joueurs arrivés à
+      échéance (file de priorité adaptative), + figeage des rangs toutes les N minutes
+    - mode 'rolling' : tick fréquent qui rafraîchit la tranche suivante du roster
+      (chaque joueur une fois par N minutes), + figeage des rangs toutes les N minutes
     """
     global scheduler
 
@@ -23,22 +34,99 @@ def start_scheduler():
 
     scheduler = BackgroundScheduler(timezone="Europe/Paris")
 
-    # Job : mise à jour toutes les N minutes
-    scheduler.add_job(
-        func=update_all_players,
-        trigger=IntervalTrigger(minutes=UPDATE_INTERVAL_MINUTES),
-        id='update_players_job',
-        name='Update Chess.com stats for all players',
-        replace_existing=True,
-        max_instances=1  # Éviter les exécutions parallèles
-    )
+    if SCHEDULER_MODE in ('priority', 'rolling'):
+        if SCHEDULER_MODE == 'priority':
+            # Job : rafraîchissement des joueurs arrivés à échéance
+            scheduler.add_job(
+                func=run_priority_tick,
+                trigger=IntervalTrigger(seconds=PRIORITY_TICK_SECONDS),
+                id='priority_refresh_job',
+                name='Refresh players whose adaptive deadline has passed',
+                replace_existing=True,
+                max_instances=1
+            )
+        else:
+            # Job : rafraîchissement de la tranche suivante du roster
+            scheduler.add_job(
+                func=run_rolling_tick,
+                trigger=IntervalTrigger(seconds=ROLLING_TICK_SECONDS),
+                id='rolling_refresh_job',
+                name='Refresh next slice of the roster',
+                replace_existing=True,
+                max_instances=1
+            )
+        # Job : previousRank figé une fois par intervalle (référence des flèches)
+        scheduler.add_job(
+            func=refresh_ranks,
+            trigger=IntervalTrigger(minutes=UPDATE_INTERVAL_MINUTES),
+            id='refresh_ranks_job',
+            name='Snapshot previousRank and prune expired promos',
+            replace_existing=True,
+            max_instances=1
+        )
+    else:
+        # Job : mise à jour toutes les N minutes
+        scheduler.add_job(
+            func=update_all_players,
+            trigger=IntervalTrigger(minutes=UPDATE_INTERVAL_MINUTES),
+            id='update_players_job',
+            name='Update Chess.com stats for all players',
+            replace_existing=True,
+            max_instances=1  # Éviter les exécutions parallèles
+        )
+
+    # Job : compaction du journal des mutations dans le snapshot players.json
+    if STORAGE_BACKEND == 'journal':
+        scheduler.add_job(
+            func=PLAYER_STORE.compact,
+            trigger=IntervalTrigger(minutes=JOURNAL_COMPACT_MINUTES),
+            id='compact_journal_job',
+            name='Fold roster journal into players.json',
+            replace_existing=True,
+            max_instances=1
+        )
+
+    # Job : export différé de players.json depuis la base SQLite
+    if STORAGE_BACKEND == 'sqlite':
+        scheduler.add_job(
+            func=PLAYER_STORE.compact,
+            trigger=IntervalTrigger(seconds=SQLITE_EXPORT_SECONDS),
+            id='sqlite_export_job',
+            name='Export SQLite roster to players.json',
+            replace_existing=True,
+            max_instances=1
+        )
+
+    # Job : rétention de l'historique long terme
+    if TIMESERIES_ENABLED:
+        scheduler.add_job(
+            func=TIMESERIES.apply_retention,
+            trigger=IntervalTrigger(hours=24),
+            id='history_retention_job',
+            name='Truncate rating history past retention',
+            replace_existing=True,
+            max_instances=1
+        )
+
+    # Job : en multi-processus, le leader relit régulièrement les commits des autres workers
+    # (push SSE même sans requête reçue par ce processus)
+    if MULTIPROCESS_ENABLED:
+        scheduler.add_job(
+            func=PLAYER_STORE.sync,
+            trigger=IntervalTrigger(seconds=ROSTER_SYNC_SECONDS),
+            id='roster_sync_job',
+            name='Pick up roster commits from other processes',
+            replace_existing=True,
+            max_instances=1
+        )
 
     scheduler.start()
-    logger.info(f"✓ Scheduler started: update every {UPDATE_INTERVAL_MINUTES} minutes")
+    logger.info(f"✓ Scheduler started ({SCHEDULER_MODE} mode): interval {UPDATE_INTERVAL_MINUTES} minutes")
 
 def stop_scheduler():
     """Arrête le scheduler proprement."""
     global scheduler
     if scheduler:
         scheduler.shutdown()
+        scheduler = None
         logger.info("Scheduler stopped")
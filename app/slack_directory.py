@@ -0,0 +1,152 @@
+# Annuaire des utilisateurs Slack (prénom / nom) : cache TTL, préchargement en masse via users.list
+import logging
+import threading
+import time
+from . import http_client
+from .config import (
+    SLACK_API_BASE_URL, SLACK_API_TIMEOUT, SLACK_BOT_TOKEN, SLACK_USER_CACHE_TTL_MINUTES, SLACK_DIRECTORY_WARMUP
+)
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Pages de users.list (Slack recommande 200 au plus) et attente maximale sur un 429
+USERS_LIST_PAGE_SIZE = 200
+MAX_RETRY_AFTER_SECONDS = 30
+
+class SlackAPIError(Exception):
+    """Réponse `ok: false` (ou HTTP non 200) de l'API Slack ; `error` est le code Slack."""
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+def names_from_profile(profile):
+    """
+    Prénom et nom d'un profil Slack, avec repli sur `real_name` découpé au premier espace.
+
+    Returns:
+        tuple (first_name, last_name), chaînes éventuellement vides
+    """
+    first_name = profile.get('first_name', '')
+    last_name = profile.get('last_name', '')
+    if not first_name and not last_name:
+        real_name = profile.get('real_name', '')
+        if real_name:
+            parts = real_name.split(' ', 1)
+            first_name = parts[0]
+            last_name = parts[1] if len(parts) > 1 else ''
+    return first_name, last_name
+
+class SlackDirectory:
+    """
+    Noms des utilisateurs Slack par user_id.
+
+    `lookup` sert depuis le cache et n'appelle users.info que sur un miss ;
+    `warm` remplit le cache en quelques appels users.list paginés (un seul
+    aller-retour par page de 200 utilisateurs au lieu d'un par commande).
+    Tous les appels ont un timeout (SLACK_API_TIMEOUT).
+    """
+
+    def __init__(self, token, base_url, ttl_seconds, timeout):
+        self.token = token
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = TTLCache(ttl_seconds)
+
+    def _call(self, method, params):
+        """GET sur une méthode de l'API Slack ; respecte un Retry-After (borné) une fois."""
+        for attempt in range(2):
+            resp = http_client.get(
+                f'{self.base_url}/{method}',
+                params=params,
+                headers={'Authorization': f'Bearer {self.token}'},
+                timeout=self.timeout
+            )
+            if resp.status_code == 429 and attempt == 0:
+                delay = min(float(resp.headers.get('Retry-After', 1)), MAX_RETRY_AFTER_SECONDS)
+                logger.warning(f"Slack {method} throttled, retrying in {delay:.0f}s")
+                time.sleep(delay)
+                continue
+            break
+        if resp.status_code != 200:
+            raise SlackAPIError(f'http_{resp.status_code}')
+        data = resp.json()
+        if not data.get('ok'):
+            raise SlackAPIError(data.get('error', 'unknown'))
+        return data
+
+    def lookup(self, user_id):
+        """
+        Prénom et nom de l'utilisateur (cache, sinon users.info).
+
+        Returns:
+            tuple (first_name, last_name)
+
+        Raises:
+            SlackAPIError si Slack refuse la requête, requests.RequestException sur une erreur réseau
+        """
+        names = self.cache.get(user_id)
+        if names is not None:
+            return names
+        data = self._call('users.info', {'user': user_id})
+        names = names_from_profile(data['user'].get('profile', {}))
+        self.cache.set(user_id, names)
+        return names
+
+    def warm(self):
+        """
+        Précharge tout l'annuaire via users.list (pagination par curseur).
+        Les comptes supprimés et les bots sont ignorés.
+
+        Returns:
+            Nombre d'utilisateurs mis en cache
+        """
+        if not self.token:
+            return 0
+        started = time.monotonic()
+        count = 0
+        pages = 0
+        cursor = None
+        try:
+            while True:
+                params = {'limit': USERS_LIST_PAGE_SIZE}
+                if cursor:
+                    params['cursor'] = cursor
+                data = self._call('users.list', params)
+                pages += 1
+                for member in data.get('members', []):
+                    if member.get('deleted') or member.get('is_bot') or not member.get('id'):
+                        continue
+                    self.cache.set(member['id'], names_from_profile(member.get('profile', {})))
+                    count += 1
+                cursor = (data.get('response_metadata') or {}).get('next_cursor')
+                if not cursor:
+                    break
+        except Exception as e:
+            logger.error(f"Slack directory warm-up stopped after {count} users: {e}")
+            return count
+        logger.info(f"Slack directory warmed: {count} users in {pages} pages ({time.monotonic() - started:.1f}s)")
+        return count
+
+    def start_warming(self, interval_seconds):
+        """Précharge l'annuaire tout de suite puis toutes les `interval_seconds`, dans un thread du processus."""
+        def loop():
+            while True:
+                self.warm()
+                time.sleep(interval_seconds)
+
+        threading.Thread(target=loop, name='slack-directory', daemon=True).start()
+
+# Instance globale utilisée par les workers Slack
+SLACK_DIRECTORY = SlackDirectory(SLACK_BOT_TOKEN, SLACK_API_BASE_URL, SLACK_USER_CACHE_TTL_MINUTES * 60, SLACK_API_TIMEOUT)
+
+def start_directory_warmup():
+    """
+    Préchargement de l'annuaire, rechargé à chaque expiration du cache.
+    Le cache est propre au processus : à appeler dans chaque worker, pas
+    seulement dans le leader, sinon les followers appellent users.info à
+    chaque commande.
+    """
+    if SLACK_BOT_TOKEN and SLACK_DIRECTORY_WARMUP:
+        SLACK_DIRECTORY.start_warming(SLACK_USER_CACHE_TTL_MINUTES * 60)
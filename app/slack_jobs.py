@@ -0,0 +1,208 @@
+# Traitement des commandes Slack : pool de workers borné, file dédoublonnée, commits du roster regroupés
+import logging
+import queue
+import threading
+import time
+from .config import SLACK_WORKERS, SLACK_QUEUE_SIZE, SLACK_COMMIT_WINDOW_MS
+from .locks import timed_lock
+from .metrics import Gauge, SLACK_JOBS_PENDING
+from .player_model import Player
+from .player_store import PLAYER_STORE, username_key
+
+logger = logging.getLogger(__name__)
+
+# Résultats de SlackJobQueue.submit
+QUEUED = 'queued'
+DUPLICATE = 'duplicate'
+FULL = 'full'
+
+class SlackJobQueue:
+    """
+    Nombre fixe de workers alimentés par une file bornée.
+
+    Chaque tâche porte une clé (commande, utilisateur Slack) : tant qu'une tâche
+    est en file ou en cours pour cette clé, une nouvelle soumission identique
+    est refusée (DUPLICATE). File pleine : FULL, la route répond tout de suite.
+    Les workers sont démarrés au premier submit.
+    """
+
+    def __init__(self, workers, max_pending, name='slack'):
+        self.workers = workers
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._keys = set()  # clés en file ou en cours de traitement
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for idx in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-worker-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Slack job queue started: {self.workers} workers, {self._queue.maxsize} slots")
+
+    def submit(self, key, func, *args):
+        """
+        Met func(*args) en file.
+
+        Returns:
+            QUEUED, DUPLICATE (même clé déjà en attente) ou FULL (file pleine)
+        """
+        with self._lock:
+            self._ensure_started()
+            if key in self._keys:
+                return DUPLICATE
+            try:
+                self._queue.put_nowait((key, func, args))
+            except queue.Full:
+                logger.warning(f"Slack job queue full, rejecting {key}")
+                return FULL
+            self._keys.add(key)
+        SLACK_JOBS_PENDING.inc()
+        return QUEUED
+
+    def _run(self):
+        while True:
+            key, func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error(f"Slack job {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._keys.discard(key)
+                SLACK_JOBS_PENDING.dec()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+class _Mutation:
+    __slots__ = ('kind', 'args', 'result', 'error', 'done')
+
+    def __init__(self, kind, args):
+        self.kind = kind
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = False
+
+class RosterCommitBatcher:
+    """
+    Regroupe les ajouts / suppressions Slack en commits du roster partagés
+    (une seule réécriture de players.json par groupe).
+
+    Commit de groupe sans thread dédié : un appelant seul commite tout de
+    suite. Les mutations arrivées pendant un commit attendent sa fin, puis le
+    premier appelant réveillé applique, sous le lock du store, toutes celles
+    en attente (dans l'ordre d'arrivée, doublons vérifiés comme avant) ; les
+    autres reçoivent simplement leur résultat. La fenêtre de `window` secondes
+    n'est ouverte que s'il y a déjà d'autres mutations en attente (rafale).
+
+    Le regroupement dépend du débit des fetchs Chess.com faits avant le
+    commit : au rate limit par défaut, les ajouts arrivent en général un par
+    un et sont commités sans attente.
+    """
+
+    def __init__(self, store, window):
+        self.store = store
+        self.window = window
+        self._pending = []
+        self._committing = False
+        self._cond = threading.Condition()
+
+    def add(self, player):
+        """
+        Ajoute un joueur.
+
+        Returns:
+            'added', 'exists' (username déjà présent) ou 'name_exists' (même prénom + nom)
+        """
+        return self._submit('add', (Player.from_dict(player),))
+
+    def remove_by_name(self, first_name, last_name):
+        """Supprime les joueurs portant ce prénom + nom ; retourne les usernames supprimés."""
+        return self._submit('remove', (first_name, last_name))
+
+    def _submit(self, kind, args):
+        mutation = _Mutation(kind, args)
+        with self._cond:
+            self._pending.append(mutation)
+            # Un commit est en cours : attendre sa fin (la mutation peut être appliquée par le suivant)
+            while self._committing and not mutation.done:
+                self._cond.wait()
+            leader = not mutation.done
+            if leader:
+                self._committing = True
+                burst = len(self._pending) > 1
+
+        if leader:
+            try:
+                if burst and self.window > 0:
+                    time.sleep(self.window)
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                self._apply(batch)
+            finally:
+                with self._cond:
+                    self._committing = False
+                    self._cond.notify_all()
+
+        if mutation.error is not None:
+            raise mutation.error
+        return mutation.result
+
+    def _apply(self, batch):
+        try:
+            with timed_lock(self.store.lock, "slack/commit"):
+                added = {}  # username -> Player ajouté dans ce lot
+                removed = []
+                for mutation in batch:
+                    if mutation.kind == 'add':
+                        mutation.result = self._apply_add(mutation.args[0], added, removed)
+                    else:
+                        mutation.result = self._apply_remove(*mutation.args, added, removed)
+                if added or removed:
+                    self.store.upsert_players(list(added.values()), removed)
+            if len(batch) > 1:
+                logger.info(f"Coalesced {len(batch)} Slack roster changes into one commit")
+        except Exception as e:
+            for mutation in batch:
+                mutation.error = e
+        finally:
+            for mutation in batch:
+                mutation.done = True
+
+    def _apply_add(self, player, added, removed):
+        key = username_key(player.username)
+        # Mêmes règles que le store : usernames comparés sans la casse
+        if key in added or (self.store.exists(player.username)
+                            and key not in {username_key(u) for u in removed}):
+            return 'exists'
+        if player.first_name and player.last_name:
+            key = (player.first_name.lower(), player.last_name.lower())
+            same_name = [p['username'] for p in self.store.find_by_name(player.first_name, player.last_name)
+                         if p['username'] not in removed]
+            if same_name or any((p.first_name.lower(), p.last_name.lower()) == key for p in added.values()):
+                return 'name_exists'
+        added[key] = player
+        return 'added'
+
+    def _apply_remove(self, first_name, last_name, added, removed):
+        key = (first_name.lower(), last_name.lower())
+        usernames = [p['username'] for p in self.store.find_by_name(first_name, last_name)
+                     if p['username'] and p['username'] not in removed]
+        removed.extend(usernames)
+        # Ajouté plus tôt dans le même lot : l'ajout est simplement annulé
+        for added_key, player in list(added.items()):
+            if (player.first_name.lower(), player.last_name.lower()) == key:
+                del added[added_key]
+                usernames.append(player.username)
+        return usernames
+
+# Instances globales utilisées par les routes Slack
+SLACK_JOBS = SlackJobQueue(SLACK_WORKERS, SLACK_QUEUE_SIZE)
+ROSTER_BATCHER = RosterCommitBatcher(PLAYER_STORE, SLACK_COMMIT_WINDOW_MS / 1000)
+
+Gauge('chessapi_slack_queue_depth', 'Slack commands waiting for a worker', func=SLACK_JOBS.qsize)
@@ -0,0 +1,159 @@
+# Serveur Server-Sent Events : notifie les navigateurs à chaque nouvelle version du roster
+import asyncio
+import json
+import logging
+import threading
+from .config import SSE_ENABLED, SSE_HOST, SSE_PORT, SSE_HEARTBEAT_SECONDS, SSE_MAX_CLIENTS
+from .metrics import Gauge
+from .player_store import PLAYER_STORE
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/api/leaderboard/stream'
+
+class SSEHub:
+    """
+    Diffuse la version du roster aux clients EventSource.
+
+    Toutes les connexions vivent dans une seule boucle asyncio (thread dédié) :
+    une connexion inactive ne coûte qu'une coroutine et une file de taille 1,
+    aucun thread de worker Flask n'est bloqué.
+    """
+
+    def __init__(self, host, port, heartbeat_seconds, max_clients):
+        self.host = host
+        self.port = port
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_clients = max_clients
+        self.loop = None
+        self.running = False
+        self._clients = set()
+        self._version = None
+
+    # --- Côté threads (store, Flask) ---
+
+    def start(self):
+        ready = threading.Event()
+        thread = threading.Thread(target=self._run, args=(ready,), name='sse-hub', daemon=True)
+        thread.start()
+        ready.wait(timeout=5)
+        if self.running:
+            PLAYER_STORE.add_listener(self.publish)
+            logger.info(f"✓ SSE server listening on {self.host}:{self.port}{STREAM_PATH}")
+        return self.running
+
+    def publish(self, version):
+        """Appelé après chaque commit du store (depuis n'importe quel thread)."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._broadcast, version)
+
+    def client_count(self):
+        return len(self._clients)
+
+    # --- Côté boucle asyncio ---
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            server = self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            logger.error(f"SSE server failed to start on port {self.port}: {e}")
+            ready.set()
+            return
+        self.running = True
+        ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            server.close()
+            self.running = False
+
+    def _broadcast(self, version):
+        self._version = version
+        for queue in self._clients:
+            # Seule la dernière version compte : remplacer un événement non encore envoyé
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(version)
+
+    @staticmethod
+    def _event(version):
+        data = json.dumps({"version": version})
+        return f"id: {version}\nevent: roster\ndata: {data}\n\n".encode('utf-8')
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        parts = request_line.decode('latin-1').split()
+        path = parts[1].split('?', 1)[0] if len(parts) > 1 else ''
+        if len(parts) < 2 or parts[0] != 'GET' or path != STREAM_PATH:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await self._close(writer)
+            return
+        if len(self._clients) >= self.max_clients:
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 30\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await self._close(writer)
+            return
+
+        queue = asyncio.Queue(maxsize=1)
+        self._clients.add(queue)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n"
+                b"Access-Control-Allow-Origin: *\r\n"
+                b"X-Accel-Buffering: no\r\n\r\n"
+                b"retry: 5000\n\n"
+            )
+            # Version courante immédiatement, sauf si le client la connaît déjà (reconnexion)
+            version = self._version if self._version is not None else PLAYER_STORE.version
+            if headers.get('last-event-id') != str(version):
+                writer.write(self._event(version))
+            await writer.drain()
+
+            while True:
+                try:
+                    version = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_seconds)
+                    writer.write(self._event(version))
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(queue)
+            await self._close(writer)
+
+    @staticmethod
+    async def _close(writer):
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+# Instance globale (démarrée par start_sse_server)
+SSE_HUB = SSEHub(SSE_HOST, SSE_PORT, SSE_HEARTBEAT_SECONDS, SSE_MAX_CLIENTS)
+
+Gauge('chessapi_sse_clients', 'Browsers connected to the SSE stream', func=SSE_HUB.client_count)
+
+def start_sse_server():
+    """Démarre le serveur SSE si activé par la config."""
+    if not SSE_ENABLED:
+        logger.info("SSE server disabled by config (SSE_ENABLED=false)")
+        return False
+    return SSE_HUB.start()
@@ -0,0 +1,289 @@
+# Backends de persistance du roster (JSON complet ou SQLite incrémental)
+import json
+import logging
+import os
+import sqlite3
+from .config import JSON_PATH, SQLITE_PATH, STORAGE_BACKEND, JOURNAL_PATH, JOURNAL_COMPACT_MAX_RECORDS
+from .player_model import Player, encode_player, encode_players, decode_players
+
+logger = logging.getLogger(__name__)
+
+def write_json_atomic(path, players):
+    """Écrit players.json (indent=2, encodeur rapide) via un fichier temporaire + rename atomique."""
+    temp_path = path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(encode_players(players, pretty=True))
+    os.replace(temp_path, path)
+
+def _file_stamp(path):
+    """(inode, mtime) du fichier, None s'il n'existe pas."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+def read_json(path):
+    """Lit players.json en liste de Player."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return decode_players(f.read())
+    except FileNotFoundError:
+        return []
+
+class JsonStorage:
+    """Backend historique : tout le roster dans players.json, réécrit à chaque mutation."""
+
+    name = 'json'
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        return read_json(self.path)
+
+    def write(self, players, changed, removed):
+        """
+        Persiste un nouvel état du roster.
+
+        Args:
+            players: Roster complet (Player, ordre conservé)
+            changed: Joueurs (Player) ajoutés ou modifiés
+            removed: Usernames supprimés
+        """
+        write_json_atomic(self.path, players)
+
+class SqliteStorage:
+    """
+    Backend SQLite (mode WAL) : une ligne par joueur, mises à jour par upsert.
+
+    Le document complet de chaque joueur est stocké en JSON, les champs
+    filtrables/triables sont dupliqués en colonnes indexées. Une écriture ne
+    coûte que ses upserts : l'export players.json (le roster servi aux clients
+    vient de la mémoire) est réécrit en différé par `compact`, comme la
+    compaction du journal, quand la base est plus récente que l'export.
+    """
+
+    name = 'sqlite'
+
+    # PRAGMA user_version une fois l'import initial de players.json fait
+    MIGRATED_VERSION = 1
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS players (
+            username TEXT PRIMARY KEY,
+            promo TEXT,
+            class TEXT,
+            rapid_current INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_players_promo ON players(promo);
+        CREATE INDEX IF NOT EXISTS idx_players_class ON players(class);
+        CREATE INDEX IF NOT EXISTS idx_players_rapid ON players(rapid_current DESC);
+    """
+
+    def __init__(self, db_path, export_path):
+        self.db_path = db_path
+        self.export_path = export_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Une seule connexion : toutes les écritures sont sérialisées par le lock du store
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _row(player):
+        return (
+            player.username,
+            player.promo,
+            player.classe,
+            player.rapid_current,
+            encode_player(player)
+        )
+
+    def _upsert(self, players):
+        rows = [self._row(p) for p in players if p.username]
+        self.conn.executemany(
+            """INSERT INTO players (username, promo, class, rapid_current, data)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(username) DO UPDATE SET
+                   promo = excluded.promo,
+                   class = excluded.class,
+                   rapid_current = excluded.rapid_current,
+                   data = excluded.data""",
+            rows
+        )
+
+    def import_json(self, path):
+        """
+        Migration : importe un players.json existant dans la base.
+
+        Returns:
+            Nombre de joueurs importés
+        """
+        players = read_json(path)
+        with self.conn:
+            self._upsert(players)
+        logger.info(f"Imported {len(players)} players from {path} into {self.db_path}")
+        return len(players)
+
+    def load(self):
+        # Migration depuis players.json une seule fois, à la création de la base (user_version
+        # sert de drapeau) : une base vidée ensuite, par suppressions, reste vide
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] < self.MIGRATED_VERSION:
+            count = self.conn.execute('SELECT COUNT(*) FROM players').fetchone()[0]
+            if count == 0 and self.export_path.exists():
+                self.import_json(self.export_path)
+            self.conn.execute(f'PRAGMA user_version = {self.MIGRATED_VERSION}')
+
+        # Ordre d'insertion (les upserts conservent le rowid), comme players.json
+        rows = self.conn.execute('SELECT data FROM players ORDER BY rowid').fetchall()
+        return [Player.from_dict(json.loads(row[0])) for row in rows]
+
+    def write(self, players, changed, removed):
+        # Transaction O(changements) : upserts + suppressions ciblées
+        with self.conn:
+            if changed:
+                self._upsert(changed)
+            if removed:
+                self.conn.executemany('DELETE FROM players WHERE username = ?', [(u,) for u in removed])
+
+    def compact_needed(self):
+        """True si la base (ou son WAL) a été modifiée après le dernier export, quel que soit le processus."""
+        exported = _file_stamp(self.export_path)
+        if exported is None:
+            return True
+        wal_path = self.db_path.with_name(self.db_path.name + '-wal')
+        return any(stamp is not None and stamp[1] >= exported[1]
+                   for stamp in (_file_stamp(self.db_path), _file_stamp(wal_path)))
+
+    def compact(self, players):
+        """Réécrit l'export players.json avec l'état courant."""
+        write_json_atomic(self.export_path, players)
+        logger.info(f"Exported {len(players)} players to {self.export_path.name}")
+
+class JournalStorage:
+    """
+    Snapshot players.json + journal append-only des mutations (NDJSON).
+
+    Chaque écriture ajoute quelques lignes au journal ({"op": "upsert", "player": ...}
+    ou {"op": "delete", "username": ...}) : le coût est proportionnel au
+    changement, pas à la taille du roster. La compaction réécrit le snapshot
+    puis vide le journal ; au démarrage, le journal est rejoué sur le snapshot.
+    Les opérations sont idempotentes, un crash entre les deux étapes de la
+    compaction est donc sans conséquence.
+
+    Le nombre d'enregistrements en attente est lu dans le fichier journal (et
+    non compté à l'écriture) : en multi-processus, il inclut les ajouts des
+    autres workers, quel que soit le processus qui compacte.
+    """
+
+    name = 'journal'
+
+    def __init__(self, snapshot_path, journal_path, compact_max_records=JOURNAL_COMPACT_MAX_RECORDS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_max_records = compact_max_records
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pending_records = 0
+        self._journal_offset = 0  # octets du journal déjà comptés dans pending_records
+        self._snapshot_stamp = None  # snapshot au moment du comptage (changé par une compaction)
+
+    def _replay(self, players):
+        by_username = {p.username: p for p in players}
+        replayed = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un crash pendant l'append
+                        logger.warning(f"Skipping corrupted journal record at line {line_no}")
+                        continue
+                    if record.get('op') == 'upsert':
+                        player = Player.from_dict(record['player'])
+                        by_username[player.username] = player
+                    elif record.get('op') == 'delete':
+                        by_username.pop(record.get('username'), None)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return list(by_username.values()), replayed
+
+    def load(self):
+        players, replayed = self._replay(read_json(self.snapshot_path))
+        if replayed:
+            logger.info(f"Replayed {replayed} journal records on top of {self.snapshot_path.name}")
+            self.compact(players)
+        return players
+
+    def reload(self):
+        """Relit snapshot + journal sans compacter (roster modifié par un autre processus)."""
+        return self._replay(read_json(self.snapshot_path))[0]
+
+    def write(self, players, changed, removed):
+        records = ['{"op":"upsert","player":' + encode_player(p) + '}' for p in changed]
+        records += [json.dumps({"op": "delete", "username": u}, ensure_ascii=False) for u in removed]
+        if not records:
+            return
+
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(r + '\n' for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Garde-fou : compaction immédiate si le journal grossit trop entre deux compactions planifiées
+        if self.count_pending() >= self.compact_max_records:
+            self.compact(players)
+
+    def count_pending(self):
+        """
+        Nombre d'enregistrements dans le journal (appelé lock du store tenu).
+        Seuls les octets ajoutés depuis le dernier comptage sont relus ; tout est
+        recompté si un autre processus a compacté entre-temps.
+        """
+        snapshot_stamp = _file_stamp(self.snapshot_path)
+        try:
+            size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            size = 0
+        if snapshot_stamp != self._snapshot_stamp or size < self._journal_offset:
+            self._snapshot_stamp = snapshot_stamp
+            self._journal_offset = 0
+            self.pending_records = 0
+        if size > self._journal_offset:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                chunk = f.read(size - self._journal_offset)
+            self.pending_records += chunk.count(b'\n')
+            self._journal_offset += len(chunk)
+        return self.pending_records
+
+    def compact_needed(self):
+        return self.count_pending() > 0
+
+    def compact(self, players):
+        """Réécrit le snapshot avec l'état courant puis vide le journal."""
+        pending = self.count_pending()
+        write_json_atomic(self.snapshot_path, players)
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        logger.info(f"Journal compacted: {pending} records folded into {self.snapshot_path.name}")
+        self._snapshot_stamp = _file_stamp(self.snapshot_path)
+        self._journal_offset = 0
+        self.pending_records = 0
+
+def create_storage(backend=STORAGE_BACKEND):
+    """Instancie le backend configuré (STORAGE_BACKEND=json|sqlite|journal)."""
+    if backend == 'sqlite':
+        return SqliteStorage(SQLITE_PATH, JSON_PATH)
+    if backend == 'journal':
+        return JournalStorage(JSON_PATH, JOURNAL_PATH)
+    if backend != 'json':
+        logger.warning(f"Unknown STORAGE_BACKEND '{backend}', falling back to json")
+    return JsonStorage(JSON_PATH)
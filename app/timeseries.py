@@ -0,0 +1,205 @@
+# Historique long terme des classements : séries binaires à pas fixe par joueur
+import logging
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from .config import (
+    TIMESERIES_ENABLED, TIMESERIES_DIR, TIMESERIES_STEP_MINUTES,
+    TIMESERIES_RAW_RETENTION_DAYS, TIMESERIES_DAILY_RETENTION_DAYS
+)
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ('raw', 'day', 'week', 'month')
+DAY_SECONDS = 86400
+
+_HEADER = struct.Struct('<q')  # Premier slot du fichier
+_RECORD = struct.Struct('<HH')  # rapid, blitz (0 = pas de point)
+_SAFE_NAME = re.compile(r'^[a-z0-9_-]+$')
+
+class RatingSeries:
+    """
+    Série à pas fixe stockée dans un fichier : un en-tête (premier slot) puis
+    un enregistrement de 4 octets par slot (rapid, blitz). Le slot d'un point
+    est son timestamp divisé par `step` ; écrire deux fois dans le même slot
+    garde la dernière valeur, les slots sans mesure valent 0.
+    """
+
+    def __init__(self, path, step):
+        self.path = path
+        self.step = step
+
+    def _first_slot(self, f):
+        raw = f.read(_HEADER.size)
+        return _HEADER.unpack(raw)[0] if len(raw) == _HEADER.size else None
+
+    def write(self, ts, rapid, blitz):
+        slot = int(ts // self.step)
+        record = _RECORD.pack(min(max(rapid, 0), 0xFFFF), min(max(blitz, 0), 0xFFFF))
+        if not self.path.exists():
+            with open(self.path, 'wb') as f:
+                f.write(_HEADER.pack(slot) + record)
+            return
+        with open(self.path, 'r+b') as f:
+            first = self._first_slot(f)
+            if first is None or slot < first:
+                return  # Antérieur à la rétention : ignoré
+            offset = _HEADER.size + (slot - first) * _RECORD.size
+            end = f.seek(0, os.SEEK_END)
+            if offset > end:
+                # Combler le trou par des slots vides
+                f.write(bytes(offset - end))
+            f.seek(offset)
+            f.write(record)
+
+    def read(self, start_ts, end_ts):
+        """Retourne [(ts, rapid, blitz)] des slots renseignés de [start_ts, end_ts]."""
+        if not self.path.exists():
+            return []
+        with open(self.path, 'rb') as f:
+            first = self._first_slot(f)
+            if first is None:
+                return []
+            start = max(first, int(start_ts // self.step))
+            end = int(end_ts // self.step)
+            if end < start:
+                return []
+            f.seek(_HEADER.size + (start - first) * _RECORD.size)
+            values = array('H')
+            values.frombytes(f.read((end - start + 1) * _RECORD.size))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        points = []
+        for i in range(0, len(values) - 1, 2):
+            rapid, blitz = values[i], values[i + 1]
+            if rapid or blitz:
+                points.append(((start + i // 2) * self.step, rapid, blitz))
+        return points
+
+    def truncate_before(self, ts):
+        """Supprime les slots antérieurs à `ts` (réécriture atomique). Retourne le nombre de slots supprimés."""
+        if not self.path.exists():
+            return 0
+        with open(self.path, 'rb') as f:
+            first = self._first_slot(f)
+            data = f.read()
+        cut = int(ts // self.step) - (first or 0)
+        if first is None or cut <= 0:
+            return 0
+        kept = data[cut * _RECORD.size:]
+        if not kept:
+            self.path.unlink()
+            return cut
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(_HEADER.pack(first + cut) + kept)
+        os.replace(tmp, self.path)
+        return cut
+
+class TimeSeriesStore:
+    """
+    Historique des classements par joueur, hors du document roster :
+    - série brute au pas `step_seconds`, conservée `raw_retention_days` jours
+    - série journalière (dernière valeur du jour UTC), conservée `daily_retention_days` jours
+    Les agrégats hebdomadaires et mensuels sont calculés à la lecture depuis la série journalière.
+    """
+
+    def __init__(self, directory, step_seconds, raw_retention_days, daily_retention_days, enabled=True):
+        self.directory = directory
+        self.step = step_seconds
+        self.raw_retention = raw_retention_days * DAY_SECONDS
+        self.daily_retention = daily_retention_days * DAY_SECONDS
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def _series(self, tier, username):
+        name = username.lower()
+        if not _SAFE_NAME.match(name):
+            raise ValueError(f"Invalid username: {username!r}")
+        step = self.step if tier == 'raw' else DAY_SECONDS
+        return RatingSeries(self.directory / tier / f"{name}.ts", step)
+
+    def exists(self, username):
+        try:
+            return self._series('day', username).path.exists()
+        except ValueError:
+            return False
+
+    def record(self, points, ts=None):
+        """
+        Enregistre un point par joueur.
+
+        Args:
+            points: itérable de (username, rapid, blitz)
+            ts: timestamp (epoch) de la mesure, maintenant par défaut
+        """
+        if not self.enabled:
+            return
+        ts = time.time() if ts is None else ts
+        written = 0
+        with self._lock:
+            for tier in ('raw', 'day'):
+                (self.directory / tier).mkdir(parents=True, exist_ok=True)
+            for username, rapid, blitz in points:
+                if not (rapid or blitz):
+                    continue
+                try:
+                    self._series('raw', username).write(ts, rapid, blitz)
+                    self._series('day', username).write(ts, rapid, blitz)
+                    written += 1
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Failed to record history for {username}: {e}")
+        logger.debug(f"Recorded {written} history points")
+
+    def query(self, username, start_ts, end_ts, resolution='day'):
+        """
+        Lit l'historique d'un joueur sur [start_ts, end_ts].
+
+        Returns:
+            liste de (ts, rapid, blitz) ; pour 'week' / 'month', ts est le début
+            de la période et la valeur est la dernière connue de la période
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Invalid resolution: {resolution}. Use one of {', '.join(RESOLUTIONS)}")
+        if resolution == 'raw':
+            return self._series('raw', username).read(start_ts, end_ts)
+
+        daily = self._series('day', username).read(start_ts, end_ts)
+        if resolution == 'day':
+            return daily
+        buckets = {}
+        for ts, rapid, blitz in daily:
+            day = datetime.fromtimestamp(ts, timezone.utc)
+            if resolution == 'week':
+                bucket = ts - day.weekday() * DAY_SECONDS
+            else:
+                bucket = int(day.replace(day=1).timestamp())
+            buckets[bucket] = (bucket, rapid, blitz)  # Les jours sont lus dans l'ordre : dernière valeur
+        return list(buckets.values())
+
+    def apply_retention(self, now=None):
+        """Tronque les séries brutes et journalières selon les durées de rétention."""
+        if not self.enabled:
+            return
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            for tier, retention in (('raw', self.raw_retention), ('day', self.daily_retention)):
+                tier_dir = self.directory / tier
+                if not tier_dir.exists():
+                    continue
+                for path in tier_dir.glob('*.ts'):
+                    step = self.step if tier == 'raw' else DAY_SECONDS
+                    removed += RatingSeries(path, step).truncate_before(now - retention)
+        logger.info(f"History retention applied: {removed} slots dropped")
+
+# Instance globale
+TIMESERIES = TimeSeriesStore(
+    TIMESERIES_DIR, TIMESERIES_STEP_MINUTES * 60,
+    TIMESERIES_RAW_RETENTION_DAYS, TIMESERIES_DAILY_RETENTION_DAYS, TIMESERIES_ENABLED
+)
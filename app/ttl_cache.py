@@ -0,0 +1,82 @@
+# Cache mémoire à durée de vie (TTL), thread-safe
+import threading
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Dictionnaire dont les entrées expirent après `ttl_seconds`.
+
+    Les compteurs `hits` / `misses` permettent de mesurer les appels évités.
+    """
+
+    def __init__(self, ttl_seconds, max_entries=None):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._data = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Retourne la valeur si elle est encore fraîche, sinon `default`."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > now:
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            if self.max_entries and len(self._data) > self.max_entries:
+                self._evict_locked()
+
+    def seed(self, key, value):
+        """Ajoute une valeur seulement si la clé est absente (sans toucher aux compteurs)."""
+        with self._lock:
+            if key in self._data:
+                return
+        self.set(key, value)
+
+    def get_or_load(self, key, loader):
+        """
+        Retourne la valeur en cache ou appelle loader(key) sur un miss.
+        Un loader qui retourne None n'est pas mis en cache (nouvel essai au prochain appel).
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader(key)
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _evict_locked(self):
+        # Supprimer d'abord les entrées expirées, puis les plus proches de l'expiration
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._data.items() if exp <= now]:
+            del self._data[key]
+        overflow = len(self._data) - self.max_entries
+        if overflow > 0:
+            for key, _ in sorted(self._data.items(), key=lambda kv: kv[1][0])[:overflow]:
+                del self._data[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
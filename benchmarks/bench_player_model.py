@@ -0,0 +1,74 @@
+# Benchmark : dicts imbriqués vs modèle Player (mémoire, tri, sérialisation)
+#
+# Usage : python benchmarks/bench_player_model.py [--count 100000]
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_players import generate_synthetic  # noqa: E402
+from app.player_model import Player, rating_key, encode_players, decode_players  # noqa: E402
+
+def measure_memory(build):
+    """Octets alloués par build() (objets conservés), via tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    source = json.dumps(generate_synthetic(args.count, seed=42), ensure_ascii=False)
+    print(f"{args.count} synthetic players, document {len(source) / 1e6:.1f} MB\n")
+
+    dicts, dict_bytes = measure_memory(lambda: json.loads(source))
+    players, player_bytes = measure_memory(lambda: decode_players(source))
+
+    dict_key = lambda x: x.get('rapid', {}).get('current', 0)  # noqa: E731 (tri historique)
+    results = [
+        ("memory / player (bytes)", dict_bytes / args.count, player_bytes / args.count, ''),
+        ("decode (s)",
+         best_of(lambda: json.loads(source), args.repeat),
+         best_of(lambda: decode_players(source), args.repeat), 's'),
+        ("sort by rapid (s)",
+         best_of(lambda: sorted(dicts, key=dict_key, reverse=True), args.repeat),
+         best_of(lambda: sorted(players, key=rating_key('rapid'), reverse=True), args.repeat), 's'),
+        ("encode compact (s)",
+         best_of(lambda: json.dumps(dicts, ensure_ascii=False, separators=(',', ':')), args.repeat),
+         best_of(lambda: encode_players(players), args.repeat), 's'),
+        ("encode indent=2 (s)",
+         best_of(lambda: json.dumps(dicts, ensure_ascii=False, indent=2), args.repeat),
+         best_of(lambda: encode_players(players, pretty=True), args.repeat), 's'),
+    ]
+
+    assert encode_players(players) == json.dumps([Player.from_dict(d).to_dict() for d in dicts],
+                                                 ensure_ascii=False, separators=(',', ':'))
+
+    print(f"{'':26}{'dict':>12}{'Player':>12}{'ratio':>8}")
+    for label, dict_value, player_value, unit in results:
+        fmt = '{:>12.0f}' if not unit else '{:>12.3f}'
+        ratio = dict_value / player_value if player_value else float('inf')
+        print(f"{label:26}{fmt.format(dict_value)}{fmt.format(player_value)}{ratio:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+# Benchmark du cycle de mise à jour contre un stub local de Chess.com
+#
+# Usage : python benchmarks/bench_updater.py [--sizes 100,1000,10000] [--modes full,rolling,priority]
+#                                            [--latency-ms 20] [--rate-429 0.01] [--rate-5xx 0.005]
+#                                            [--output results.json]
+#
+# Chaque (taille, mode) tourne dans un processus neuf (RSS et état des modules isolés),
+# avec un roster synthétique et un STATE_DIR temporaires : data/players.json n'est jamais touché.
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+def _run_cycle(mode):
+    """Rafraîchit chaque joueur une fois avec la stratégie du mode donné."""
+    from app import chess_updater, refresh_queue
+    from app.config import UPDATE_INTERVAL_MINUTES, ROLLING_TICK_SECONDS
+    from app.player_store import PLAYER_STORE
+
+    if mode == 'full':
+        chess_updater.update_all_players()
+    elif mode == 'rolling':
+        # Les ticks d'un intervalle complet, enchaînés sans attente
+        for _ in range(math.ceil(UPDATE_INTERVAL_MINUTES * 60 / ROLLING_TICK_SECONDS)):
+            refresh_queue.run_rolling_tick()
+        chess_updater.refresh_ranks()
+    elif mode == 'priority':
+        refresh_queue.REFRESH_QUEUE.sync(PLAYER_STORE.usernames(), time.time())
+        refresh_queue.REFRESH_QUEUE.requeue(PLAYER_STORE.usernames(), time.time())
+        for _ in range(100):
+            refresh_queue.run_priority_tick()
+            next_due = refresh_queue.REFRESH_QUEUE.stats()['nextDueInSeconds']
+            if next_due is None or next_due > 0:
+                break
+        chess_updater.refresh_ranks()
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+def run_child(mode, rounds):
+    """Exécuté dans le sous-processus : mesure `rounds` cycles (le premier à cache HTTP froid)."""
+    from app import chess_updater, refresh_queue
+    from app.http_client import get_http_stats
+    from app.locks import get_lock_stats
+    from app.player_store import PLAYER_STORE
+
+    # Les horaires de fonctionnement ne s'appliquent pas au benchmark
+    chess_updater.should_run_update = lambda: True
+    refresh_queue.should_run_update = chess_updater.should_run_update
+
+    loaded_at = time.perf_counter()
+    players = len(PLAYER_STORE)
+    load_seconds = time.perf_counter() - loaded_at
+
+    results = []
+    for round_no in range(rounds):
+        requests_before = get_http_stats()['requests']
+        locks_before = get_lock_stats()
+        started = time.perf_counter()
+        _run_cycle(mode)
+        elapsed = time.perf_counter() - started
+        requests = get_http_stats()['requests'] - requests_before
+
+        hold_total = 0.0
+        hold_max = 0.0
+        for name, entry in get_lock_stats().items():
+            before = locks_before.get(name, {"hold_ms": 0.0})
+            hold_total += entry['hold_ms'] - before['hold_ms']
+            hold_max = max(hold_max, entry['max_hold_ms'])
+        results.append({
+            "round": 'cold' if round_no == 0 else 'warm',
+            "cycle_s": round(elapsed, 3),
+            "requests": requests,
+            "req_per_s": round(requests / elapsed, 1) if elapsed else None,
+            "lock_hold_total_ms": round(hold_total, 1),
+            "lock_hold_max_ms": round(hold_max, 1)
+        })
+
+    print(json.dumps({
+        "players": players,
+        "load_s": round(load_seconds, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rounds": results
+    }))
+
+def run_case(size, mode, args, roster_path, base_url):
+    state_dir = Path(tempfile.mkdtemp(prefix=f'chessapi-bench-{size}-{mode}-'))
+    try:
+        players_path = state_dir / 'players.json'
+        shutil.copy(roster_path, players_path)
+        env = dict(
+            os.environ,
+            PYTHONPATH=str(ROOT),
+            STATE_DIR=str(state_dir),
+            PLAYERS_JSON_PATH=str(players_path),
+            CHESS_API_BASE_URL=base_url,
+            CHESS_API_RATE_LIMIT=str(args.rate_limit),
+            CHESS_API_BURST=str(max(1, int(args.rate_limit))),
+            UPDATE_MAX_WORKERS=str(args.workers),
+            SCHEDULER_MODE=mode,
+            STORAGE_BACKEND=args.backend
+        )
+        proc = subprocess.run(
+            [sys.executable, __file__, '--child', '--mode', mode, '--rounds', str(args.rounds)],
+            env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr[-4000:])
+            raise RuntimeError(f"Benchmark {size}/{mode} failed (exit {proc.returncode})")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cycle de mise à jour")
+    parser.add_argument('--sizes', default='100,1000,10000')
+    parser.add_argument('--modes', default='full,rolling,priority')
+    parser.add_argument('--rounds', type=int, default=2, help="Cycles par cas (le premier à cache HTTP froid)")
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-5xx', type=float, default=0.0)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--rate-limit', type=float, default=1000, help="CHESS_API_RATE_LIMIT des cycles mesurés")
+    parser.add_argument('--workers', type=int, default=8, help="UPDATE_MAX_WORKERS des cycles mesurés")
+    parser.add_argument('--backend', default='json', help="STORAGE_BACKEND des cycles mesurés")
+    parser.add_argument('--output', help="Fichier JSON des résultats (suivi des régressions)")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.mode, args.rounds)
+        return
+
+    from benchmarks.chess_stub import start_stub
+    from generate_players import generate_synthetic
+
+    server, stub, base_url = start_stub(
+        latency_ms=args.latency_ms, rate_429=args.rate_429, rate_5xx=args.rate_5xx, change_rate=args.change_rate
+    )
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    modes = [m for m in args.modes.split(',') if m]
+    work_dir = Path(tempfile.mkdtemp(prefix='chessapi-bench-'))
+    results = []
+
+    print(f"Stub: latency {args.latency_ms}ms, 429 {args.rate_429:.1%}, 5xx {args.rate_5xx:.1%} | "
+          f"rate limit {args.rate_limit}/s, {args.workers} workers, {args.backend} backend\n")
+    print(f"{'players':>8} {'mode':>9} {'round':>6} {'cycle s':>9} {'req':>7} {'req/s':>8} "
+          f"{'lock ms':>9} {'max ms':>8} {'429':>5} {'5xx':>5} {'RSS MB':>8}")
+    try:
+        for size in sizes:
+            roster_path = work_dir / f'players-{size}.json'
+            with open(roster_path, 'w', encoding='utf-8') as f:
+                json.dump(generate_synthetic(size, seed=size), f, ensure_ascii=False)
+            for mode in modes:
+                counts_before = dict(stub.counts)
+                case = run_case(size, mode, args, roster_path, base_url)
+                case.update(size=size, mode=mode, stub={k: stub.counts[k] - counts_before[k] for k in stub.counts})
+                results.append(case)
+                for r in case['rounds']:
+                    print(f"{size:>8} {mode:>9} {r['round']:>6} {r['cycle_s']:>9.2f} {r['requests']:>7} "
+                          f"{r['req_per_s']:>8} {r['lock_hold_total_ms']:>9} {r['lock_hold_max_ms']:>8} "
+                          f"{case['stub']['429']:>5} {case['stub']['5xx']:>5} {case['peak_rss_mb']:>8}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        report = {
+            "date": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "params": {k: v for k, v in vars(args).items() if k not in ('child', 'mode', 'output')},
+            "results": results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == '__main__':
+    main()
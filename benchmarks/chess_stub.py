@@ -0,0 +1,142 @@
+# Serveur local imitant l'API publique Chess.com (/pub/player/<u> et /pub/player/<u>/stats)
+#
+# Usage autonome : python benchmarks/chess_stub.py --port 8089 --latency-ms 50 --rate-429 0.01
+# puis CHESS_API_BASE_URL=http://127.0.0.1:8089/pub/player python api_server.py
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubState:
+    """Paramètres et compteurs partagés par les threads du serveur."""
+
+    def __init__(self, latency_ms=0.0, rate_429=0.0, rate_5xx=0.0, change_rate=0.1, retry_after=1):
+        self.latency = latency_ms / 1000
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.change_rate = change_rate
+        self.retry_after = retry_after
+        self.counts = {"profile": 0, "stats": 0, "200": 0, "304": 0, "429": 0, "5xx": 0}
+        self._ratings = {}
+        self._lock = threading.Lock()
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def rating(self, username):
+        """Score stable par joueur, modifié à chaque appel avec une probabilité `change_rate`."""
+        with self._lock:
+            rating = self._ratings.get(username)
+            if rating is None:
+                rating = 800 + int(hashlib.md5(username.encode()).hexdigest()[:4], 16) % 2000
+            elif random.random() < self.change_rate:
+                rating += random.randint(-15, 15)
+            self._ratings[username] = rating
+            return rating
+
+def make_handler(state):
+    class ChessStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            if state.latency:
+                time.sleep(state.latency)
+
+            parts = self.path.split('?', 1)[0].strip('/').split('/')
+            if len(parts) < 3 or parts[:2] != ['pub', 'player']:
+                self._send(404)
+                return
+
+            draw = random.random()
+            if draw < state.rate_429:
+                state.count("429")
+                self._send(429, headers={'Retry-After': str(state.retry_after)})
+                return
+            if draw < state.rate_429 + state.rate_5xx:
+                state.count("5xx")
+                self._send(503)
+                return
+
+            username = parts[2].lower()
+            if len(parts) > 3 and parts[3] == 'stats':
+                state.count("stats")
+                rating = state.rating(username)
+                payload = {
+                    "chess_rapid": {
+                        "last": {"rating": rating, "date": 1700000000},
+                        "best": {"rating": rating + 50},
+                        "record": {"win": 120, "loss": 80, "draw": 15}
+                    },
+                    "chess_blitz": {
+                        "last": {"rating": rating - 100, "date": 1700000000},
+                        "best": {"rating": rating}
+                    }
+                }
+            else:
+                state.count("profile")
+                payload = {"username": username, "avatar": f"https://images.example/{username}.png"}
+
+            body = json.dumps(payload).encode('utf-8')
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                state.count("304")
+                self._send(304, headers={'ETag': etag})
+                return
+            state.count("200")
+            self._send(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+    return ChessStubHandler
+
+def start_stub(host='127.0.0.1', port=0, **options):
+    """
+    Démarre le stub dans un thread.
+
+    Returns:
+        tuple (serveur, état, URL de base à mettre dans CHESS_API_BASE_URL)
+    """
+    state = StubState(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='chess-stub', daemon=True).start()
+    return server, state, f"http://{host}:{server.server_port}/pub/player"
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub local de l'API Chess.com")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--rate-429', type=float, default=0)
+    parser.add_argument('--rate-5xx', type=float, default=0)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub(
+        args.host, args.port, latency_ms=args.latency_ms, rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx, change_rate=args.change_rate
+    )
+    print(f"Chess.com stub listening: CHESS_API_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(state.counts)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
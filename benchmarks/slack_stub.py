@@ -0,0 +1,112 @@
+# Serveur local imitant l'API Web Slack (users.info, users.list paginé)
+#
+# Usage autonome : python benchmarks/slack_stub.py --port 8090 --users 5000 --latency-ms 100
+# puis SLACK_API_BASE_URL=http://127.0.0.1:8090/api SLACK_BOT_TOKEN=xoxb-stub python api_server.py
+#
+# Les utilisateurs sont U000001..U<N> : prénom "Load<n>", nom "User<n>" (un sur dix n'a que real_name).
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+class SlackStubState:
+    """Annuaire synthétique et compteurs d'appels par méthode."""
+
+    def __init__(self, users=1000, latency_ms=0.0):
+        self.users = users
+        self.latency = latency_ms / 1000
+        self.counts = {"users.info": 0, "users.list": 0}
+        self._lock = threading.Lock()
+
+    def count(self, method):
+        with self._lock:
+            self.counts[method] += 1
+
+    def member(self, n):
+        if n % 10 == 0:
+            profile = {"first_name": "", "last_name": "", "real_name": f"Load{n} User{n}"}
+        else:
+            profile = {"first_name": f"Load{n}", "last_name": f"User{n}", "real_name": f"Load{n} User{n}"}
+        return {"id": f"U{n:06d}", "deleted": False, "is_bot": False, "profile": profile}
+
+def make_handler(state):
+    class SlackStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if state.latency:
+                time.sleep(state.latency)
+            url = urlsplit(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            method = url.path.rsplit('/', 1)[-1]
+
+            if not self.headers.get('Authorization', '').startswith('Bearer '):
+                self._send_json({"ok": False, "error": "not_authed"})
+            elif method == 'users.info':
+                state.count(method)
+                user_id = params.get('user', '')
+                n = int(user_id[1:]) if user_id[1:].isdigit() else 0
+                if user_id.startswith('U') and 1 <= n <= state.users:
+                    self._send_json({"ok": True, "user": state.member(n)})
+                else:
+                    self._send_json({"ok": False, "error": "user_not_found"})
+            elif method == 'users.list':
+                state.count(method)
+                limit = min(int(params.get('limit', 200)), 1000)
+                start = int(params.get('cursor') or 0)
+                end = min(start + limit, state.users)
+                self._send_json({
+                    "ok": True,
+                    "members": [state.member(n) for n in range(start + 1, end + 1)],
+                    "response_metadata": {"next_cursor": str(end) if end < state.users else ""}
+                })
+            else:
+                self._send_json({"ok": False, "error": "unknown_method"})
+
+    return SlackStubHandler
+
+def start_stub(host='127.0.0.1', port=0, **options):
+    """
+    Démarre le stub dans un thread.
+
+    Returns:
+        tuple (serveur, état, URL de base à mettre dans SLACK_API_BASE_URL)
+    """
+    state = SlackStubState(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='slack-stub', daemon=True).start()
+    return server, state, f"http://{host}:{server.server_port}/api"
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub local de l'API Web Slack")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub(args.host, args.port, users=args.users, latency_ms=args.latency_ms)
+    print(f"Slack stub listening: SLACK_API_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(state.counts)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
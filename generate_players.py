@@ -1,3 +1,4 @@
+import argparse
 import json
 import random
 from datetime import datetime
@@ -59,18 +60,8 @@ top_players = [
     ("Mariya", "Muzychuk", "MariyaMuzychuk"),
 ]
 
-# Charger les joueurs existants
-with open('data/players.json', 'r', encoding='utf-8') as f:
-    players = json.load(f)
-
-print(f"Joueurs existants: {len(players)}")
-
-# Ajouter 53 nouveaux joueurs
-promos = ["2025", "2026", "2027", "2028", "2029"]
-classes = ["A", "B", "C", "D"]
-today = datetime.now().date().isoformat()
-
-for i, (first_name, last_name, username) in enumerate(top_players[:53]):
+def make_player(first_name, last_name, username, previous_rank, promos, classes, today):
+    """Génère un joueur avec des scores et un historique réalistes."""
     rapid_current = random.randint(800, 2800)
     rapid_best = rapid_current + random.randint(0, 200)
     blitz_current = rapid_current + random.randint(-300, 300)
@@ -84,13 +75,13 @@ for i, (first_name, last_name, username) in enumerate(top_players[:53]):
         history.append(max(400, min(3000, base + variation)))
         base = history[-1]
 
-    player = {
+    return {
         "username": username,
         "firstName": first_name,
         "lastName": last_name,
         "promo": random.choice(promos),
         "class": random.choice(classes),
-        "previousRank": len(players) + i + 1,
+        "previousRank": previous_rank,
         "rapid": {
             "current": rapid_current,
             "best": rapid_best
@@ -109,11 +100,60 @@ for i, (first_name, last_name, username) in enumerate(top_players[:53]):
         "avatar": f"https://images.chesscomfiles.com/uploads/v1/user/{random.randint(1000000, 9999999)}.{random.choice(['jpeg', 'png'])}"
     }
 
-    players.append(player)
+promos = ["2025", "2026", "2027", "2028", "2029"]
+classes = ["A", "B", "C", "D"]
+
+def generate_synthetic(count, seed=None):
+    """
+    Génère `count` joueurs synthétiques (benchmarks), à partir des vrais noms du top 100
+    suffixés d'un numéro pour garder des usernames uniques.
+    """
+    if seed is not None:
+        random.seed(seed)
+    today = datetime.now().date().isoformat()
+    future_promos = [str(datetime.now().year + i) for i in range(1, 6)]
+    players = []
+    for i in range(count):
+        first_name, last_name, username = top_players[i % len(top_players)]
+        suffix = i // len(top_players)
+        if suffix:
+            username = f"{username}_{suffix}"
+        players.append(make_player(first_name, last_name, username, i + 1, future_promos, classes, today))
+    return players
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajoute des joueurs de test à data/players.json")
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help="Génère N joueurs synthétiques dans --output au lieu de compléter data/players.json")
+    parser.add_argument('--output', default='data/players.json')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        players = generate_synthetic(args.synthetic, args.seed)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(players, f, indent=2, ensure_ascii=False)
+        print(f"✓ {len(players)} joueurs synthétiques écrits dans {args.output}")
+        return
+
+    # Charger les joueurs existants
+    with open('data/players.json', 'r', encoding='utf-8') as f:
+        players = json.load(f)
+
+    print(f"Joueurs existants: {len(players)}")
+
+    # Ajouter 53 nouveaux joueurs
+    today = datetime.now().date().isoformat()
+
+    for i, (first_name, last_name, username) in enumerate(top_players[:53]):
+        players.append(make_player(first_name, last_name, username, len(players) + i + 1, promos, classes, today))
+
+    # Sauvegarder
+    with open('data/players.json', 'w', encoding='utf-8') as f:
+        json.dump(players, f, indent=2, ensure_ascii=False)
 
-# Sauvegarder
-with open('data/players.json', 'w', encoding='utf-8') as f:
-    json.dump(players, f, indent=2, ensure_ascii=False)
+    print(f"Total joueurs: {len(players)}")
+    print("✓ 53 joueurs ajoutés avec succès!")
 
-print(f"Total joueurs: {len(players)}")
-print("✓ 53 joueurs ajoutés avec succès!")
+if __name__ == '__main__':
+    main()
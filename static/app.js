@@ -119,32 +119,12 @@ function calculateClass(promoYear) {
 async function loadClientOnly(limit){
   setStatus('Chargement…');
   try{
-    // Charger le JSON (mis à jour quotidiennement par update_leaderboard.py)
-    const playersRes = await fetch('data/players.json?t=' + Date.now()); // cache buster
-    if(!playersRes.ok) throw new Error('Impossible de lire data/players.json');
-    let players = await playersRes.json();
-
-    // Le JSON contient déjà: current, best, history7days, previousRank
-    // Plus besoin d'appeler l'API Chess.com !
-
-    // IMPORTANT: Trier les joueurs par score Rapid décroissant
-    players.sort((a, b) => ((b.rapid?.current || 0) - (a.rapid?.current || 0)));
-
-    // Calculer la direction des flèches
-    players.forEach((p, idx) => {
-      const currentRank = idx + 1;
-      if(p.previousRank == null){
-        p.direction = 'neutral';
-      } else if(currentRank < p.previousRank){
-        p.direction = 'up'; // rank amélioré (nombre plus petit = meilleur)
-      } else if(currentRank > p.previousRank){
-        p.direction = 'down';
-      } else {
-        p.direction = 'neutral';
-      }
-    });
+    // Page du classement déjà triée et classée par le serveur (rank + direction inclus)
+    const res = await fetch(`api/leaderboard?limit=${limit}`);
+    if(!res.ok) throw new Error('Impossible de lire /api/leaderboard');
+    const page = await res.json();
 
-    render(players.slice(0, 50));
+    render(page.players);
     setLastUpdated(new Date());
     
   }catch(err){
@@ -163,7 +143,7 @@ async function updateDailyHistory(players) {
   
   try {
     // Récupérer la BD actuelle
-    const response = await fetch('data/players.json?t=' + Date.now());
+    const response = await fetch('data/players.json', { cache: 'no-cache' }); // revalidation ETag (304 si inchangé)
     const dbPlayers = await response.json();
     
     // Pour chaque joueur, mettre à jour son historique
@@ -214,7 +194,7 @@ async function updateDailyHistory(players) {
   
   try {
     // Récupérer la BD actuelle
-    const response = await fetch('data/players.json?t=' + Date.now());
+    const response = await fetch('data/players.json', { cache: 'no-cache' }); // revalidation ETag (304 si inchangé)
     const dbPlayers = await response.json();
     
     // Pour chaque joueur, mettre à jour son historique
@@ -438,14 +418,43 @@ function render(players){
   }
 }
 
+// Push serveur (SSE) : recharger seulement quand une nouvelle version du roster est publiée.
+// Si le flux n'est pas disponible, retour au polling toutes les REFRESH_INTERVAL ms.
+let liveSource = null;
+let liveVersion = null;
+
+function startLiveUpdates(){
+  if(!window.EventSource) { startAutoRefresh(); return; }
+  liveSource = new EventSource('api/leaderboard/stream');
+  liveSource.addEventListener('open', ()=>{
+    stopAutoRefresh();
+    const btn = document.getElementById('next-refresh');
+    if(btn) btn.textContent = 'Mises à jour en direct';
+  });
+  liveSource.addEventListener('roster', (e)=>{
+    const { version } = JSON.parse(e.data);
+    if(liveVersion !== null && version !== liveVersion) loadClientOnly(50);
+    liveVersion = version;
+  });
+  liveSource.addEventListener('error', ()=>{
+    // EventSource se reconnecte seul ; s'il abandonne (CLOSED), repasser en polling
+    if(liveSource.readyState === EventSource.CLOSED){
+      liveSource = null;
+      startAutoRefresh();
+    } else if(!countdownInterval) {
+      startAutoRefresh();
+    }
+  });
+}
+
 // Note: 'load' button removed — use the refresh button instead.
 
 // Auto load default on open
 window.addEventListener('load', ()=>{
   const limit = 50;
   loadClientOnly(limit).then(()=>{
-    // start auto-refresh countdown after first successful load
-    startAutoRefresh();
+    // écouter les mises à jour poussées par le serveur (polling en secours)
+    startLiveUpdates();
   });
 });
 
@@ -454,6 +463,6 @@ document.addEventListener('click', (e)=>{
   const btn = e.target.closest && e.target.closest('#next-refresh');
   if(!btn) return;
   loadClientOnly(50).then(()=>{
-    startAutoRefresh();
+    if(!liveSource) startAutoRefresh();
   });
 });
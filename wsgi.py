@@ -0,0 +1,13 @@
+# Point d'entrée WSGI de production (plusieurs workers) :
+#   gunicorn -w 4 --threads 8 -b 0.0.0.0:5000 wsgi:app
+#
+# Active le mode multi-processus (lock fichier du roster, version partagée, un seul
+# processus leader pour le scheduler et le serveur SSE). Ne pas utiliser --preload :
+# chaque worker doit importer l'application (et ses threads) après le fork.
+import os
+
+os.environ.setdefault('MULTIPROCESS_ENABLED', 'true')
+
+from api_server import app, start_background_services  # noqa: E402
+
+start_background_services()